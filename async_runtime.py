@@ -0,0 +1,170 @@
+"""
+Group: Controller Liberators
+Asyncio based runtime.
+
+Capture and pose inference run in executors so the event loop never blocks on camera.read() or
+pose.process(). The event loop itself schedules the cooperative stages:
+- capture: read + color conversion in the capture executor, newest frame wins
+- inference: detection in the inference executor, feature extraction on completion
+- render: GUI events and drawing at the display frame rate
+- control: controller output at its own cadence, independent of inference progress
+Preset callbacks fired from the calibration window thread are marshalled onto the loop, and further I/O
+sources (e.g. remote telemetry) can be attached with add_task().
+
+Usage:
+    runtime = AsyncRuntime(ctx, camera, detector, mapper, gui, startup=startup)
+    asyncio.run(runtime.run())
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+from latency import FrameStamp
+
+
+class AsyncRuntime:
+    """
+    Run the application stages as asyncio tasks.
+    """
+
+    def __init__(self, ctx, camera, detector, mapper, gui, control_hz: float = 60.0, recorder=None, startup=None):
+        self.ctx = ctx
+        self.camera = camera
+        self.detector = detector
+        self.mapper = mapper
+        self.gui = gui
+        self.recorder = recorder  # optional LandmarkRecorder
+        self.startup = startup  # optional Startup, reported on the first control
+        self.control_period: float = 1.0 / control_hz if control_hz > 0 else 0.0  # 0: emit on each detection
+
+        self._capture_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="async-capture")
+        self._inference_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="async-inference")
+        self._frames: asyncio.Queue = None  # capture -> inference, newest frame wins
+        self._stop: asyncio.Event = None
+        self._extra_tasks = []
+
+        self.landmarks = None  # newest detected landmarks
+        self.frame = None  # frame of the newest detection, for display
+        self.features = None  # features of the newest detection
+
+    def add_task(self, coro_fn) -> None:
+        """
+        Attach an extra coroutine function coro_fn(runtime) to run alongside the stages, e.g. an I/O source.
+        """
+        self._extra_tasks.append(coro_fn)
+
+    def stop(self) -> None:
+        if self._stop is not None:
+            self._stop.set()
+
+    def _trigger_control(self) -> None:
+        self.mapper.trigger_control()
+        if self.startup is not None and "first control" not in self.startup.milestones:
+            self.startup.mark("first control")  # time-to-first-control
+            self.startup.report()
+            self.startup.shutdown()
+
+    def _read(self):
+        ret, frame = self.camera.read()
+        if not ret:
+            return None
+        stamp = FrameStamp(self.camera.frame_seq, self.camera.frame_timestamp)
+        with self.ctx.profiler.span("cvtColor"):
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), stamp
+
+    async def _capture_task(self) -> None:
+        loop = asyncio.get_running_loop()
+        while not self._stop.is_set():
+            item = await loop.run_in_executor(self._capture_executor, self._read)
+            if item is None:
+                print("Cannot capture frame")
+                self.stop()
+                break
+            if self._frames.full():
+                self._frames.get_nowait()  # drop the stale frame, inference takes the newest
+            self._frames.put_nowait(item)
+
+    async def _inference_task(self) -> None:
+        loop = asyncio.get_running_loop()
+        while not self._stop.is_set():
+            frame, stamp = await self._frames.get()
+            landmarks, frame = await loop.run_in_executor(
+                self._inference_executor, self.detector.get_landmarks, frame, stamp)
+            stamp = self.detector.last_stamp
+            shown = self.frame
+            self.landmarks, self.frame = landmarks, frame
+            if shown is not None and shown is not frame:
+                self.detector.release_frame(shown)  # the render task only draws self.frame
+            if landmarks and self.detector.fresh:  # a repeated result keeps its features
+                if self.recorder and stamp is not None:  # records need the capture time
+                    self.recorder.write(stamp.t_capture, stamp.seq, landmarks)
+                self.features = self.mapper.extract_features(landmarks, stamp)
+                if not self.control_period:
+                    self._trigger_control()
+
+    async def _control_task(self) -> None:
+        # Controller output at a fixed cadence, repeating the newest features between detections
+        if not self.control_period:
+            return
+        next_due = time.perf_counter()
+        while not self._stop.is_set():
+            if self.features is not None:
+                self._trigger_control()
+            next_due += self.control_period
+            await asyncio.sleep(max(0.0, next_due - time.perf_counter()))
+
+    async def _render_task(self) -> None:
+        gui = self.gui
+        frame_period = 1.0 / gui.fps
+        next_due = time.perf_counter()
+        while not self._stop.is_set():
+            if not gui.handle_events():
+                print("Quit application")
+                self.stop()
+                break
+            gui.clock_tick(limit_fps=False)  # pacing is done by the event loop below
+            gui.clear_color()
+            if self.frame is not None:
+                gui.render_np_frame(self.frame)
+            if self.landmarks and self.features is not None:
+                gui.render_pose_features(self.features)
+                gui.render_game_controls(self.features)
+            gui.update_display()
+            next_due = max(next_due + frame_period, time.perf_counter() - frame_period)
+            await asyncio.sleep(max(0.0, next_due - time.perf_counter()))
+
+    def _on_task_done(self, task: asyncio.Task) -> None:
+        # A stage failing must bring the whole runtime down instead of leaving it half running
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Stage '{task.get_name()}' failed: {task.exception()!r}")
+            self.stop()
+
+    async def run(self) -> None:
+        """
+        Run all stages until the window is closed or the camera stops delivering.
+        """
+        loop = asyncio.get_running_loop()
+        self._frames = asyncio.Queue(maxsize=1)
+        self._stop = asyncio.Event()
+        # Preset callbacks may be fired from the calibration window thread, run them on the loop instead
+        self.ctx.preset_mgr.callback_dispatcher = loop.call_soon_threadsafe
+
+        tasks = [asyncio.create_task(coro, name=name) for name, coro in (
+            ("capture", self._capture_task()),
+            ("inference", self._inference_task()),
+            ("control", self._control_task()),
+            ("render", self._render_task()),
+        )]
+        tasks += [asyncio.create_task(fn(self)) for fn in self._extra_tasks]
+        for task in tasks:
+            task.add_done_callback(self._on_task_done)
+        try:
+            await self._stop.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.ctx.preset_mgr.callback_dispatcher = None
+            self._capture_executor.shutdown(wait=True)
+            self._inference_executor.shutdown(wait=True)
@@ -0,0 +1,113 @@
+"""
+Group: Controller Liberators
+Batched offline mapping for parameter sweeps over recorded sessions.
+
+Evaluates the PoseControlMapper feature math for every frame of a recorded session and many mapping
+parameter sets at once. The hand geometry (steering angle and fist radius, after the optional jitter filter)
+does not depend on the parameters and is computed once for all T frames; only the pressures are evaluated
+per parameter set, in chunks to bound memory. The brake/throttle hold between their zones, which makes the
+per-frame mapper stateful, is reproduced with a forward fill along the time axis. A thousand candidate presets
+are so scored against a few minutes of recorded driving in a fraction of a second instead of replaying it in
+real time.
+
+Usage:
+    replay = LandmarkReplay("Recordings/session.lmrec")
+    preset = preset_mgr.get_preset("sports-car")
+    params = param_grid(preset.mapping, {"steering safe angle": np.linspace(0.0, 15.0, 16)})
+    controls = map_batch(replay.landmarks, params, curves=ResponseCurves(preset.curves),
+                         hand_filter=preset.filter, timestamps=replay.timestamps)  # (P, T, 4)
+"""
+
+import itertools
+from typing import Dict, Sequence
+import numpy as np
+from mapping import HAND_WEIGHTS, PRESET_MAPPING_KEYS, center_geometry, steer_ramp, pedal_ramps
+from control_filter import HandFilter
+from response_curves import ResponseCurves
+
+CHANNELS = ("steer", "throttle", "brake", "steer angle")
+"""Control channels of the output, same order as recording.replay_through_mapper"""
+
+
+def param_grid(base: Dict[str, float], ranges: Dict[str, Sequence[float]]) -> Dict[str, np.ndarray]:
+    """
+    Cartesian product of parameter values.
+    :param base: mapping parameters used for every parameter not swept, e.g. Preset().mapping
+    :param ranges: parameter name -> candidate values
+    :return: parameter name -> (P,) array, P being the product of the range lengths
+    """
+    unknown = set(ranges) - set(PRESET_MAPPING_KEYS)
+    if unknown:
+        raise KeyError(f"Unknown mapping parameters: {', '.join(sorted(unknown))}")
+    names = list(ranges)
+    combos = np.array(list(itertools.product(*(ranges[n] for n in names))), dtype=np.float64)
+    params = {n: np.full(len(combos), float(base[n])) for n in PRESET_MAPPING_KEYS}
+    for i, n in enumerate(names):
+        params[n] = combos[:, i]
+    return params
+
+
+def filter_centers(centers: np.ndarray, timestamps: np.ndarray, settings: dict) -> np.ndarray:
+    """
+    Run the preset jitter filter over the (T, 2, 2) hand centers of a session in place, as the per-frame mapper
+    does on a replay: recorded frames have no pipeline latency, so nothing is extrapolated.
+    :param settings: preset filter settings, e.g. preset.filter
+    """
+    hand_filter = HandFilter()
+    hand_filter.configure(settings)
+    if not hand_filter.enabled:
+        return centers
+    if timestamps is None:
+        raise ValueError("Filtering the hand centers needs the frame timestamps")
+    flat = centers.reshape(len(centers), 4)  # (left x, left y, right x, right y) per frame
+    for i, t in enumerate(np.asarray(timestamps, dtype=np.float64).tolist()):
+        flat[i] = hand_filter.process(t, 0.0, flat[i])
+    return centers
+
+
+def map_batch(landmarks: np.ndarray, params: Dict[str, np.ndarray], chunk_size: int = 256,
+              curves: ResponseCurves = None, hand_filter: dict = None, timestamps: np.ndarray = None) -> np.ndarray:
+    """
+    Controls of every frame for every parameter set.
+    :param landmarks: (T, 33, 4) landmark array, e.g. LandmarkReplay.landmarks
+    :param params: parameter name -> (P,) values (see param_grid), missing names raise KeyError
+    :param chunk_size: parameter sets evaluated together, bounds the temporary memory to a few (chunk, T) arrays
+    :param curves: response curves applied to the pressures, e.g. ResponseCurves(preset.curves), None for linear
+    :param hand_filter: jitter filter settings applied to the hand centers (preset.filter), None for unfiltered
+    :param timestamps: (T,) capture timestamps, e.g. LandmarkReplay.timestamps, needed by the jitter filter
+    :return: (P, T, 4) float32 array of (steer, throttle, brake, steer angle), the same values
+        recording.replay_through_mapper produces from a fresh mapper with the same curves and filter
+    """
+    centers = np.matmul(HAND_WEIGHTS, np.asarray(landmarks)[..., :2])  # (T, 2, 2): (left, right) hand (x, y)
+    if hand_filter:
+        filter_centers(centers, timestamps, hand_filter)
+    steer_angle, radius = center_geometry(centers)
+    curves = curves or ResponseCurves()
+    p = np.broadcast_arrays(*(np.atleast_1d(np.asarray(params[n], dtype=np.float64)) for n in PRESET_MAPPING_KEYS))
+    num_sets, num_frames = p[0].shape[0], steer_angle.shape[0]
+    out = np.empty((num_sets, num_frames, len(CHANNELS)), dtype=np.float32)
+    out[:, :, 3] = steer_angle
+
+    side = np.sign(steer_angle)  # -1 left, 1 right
+    frame_index = np.arange(num_frames)
+    for start in range(0, num_sets, chunk_size):
+        sl = slice(start, start + chunk_size)
+        safe_angle, left_border, right_border, brake_min, brake_max, throttle_min, throttle_max = (
+            v[sl, None] for v in p)
+
+        steer = steer_ramp(steer_angle, safe_angle, left_border, right_border)
+        out[sl, :, 0] = curves.steering.apply(np.abs(steer)) * side
+
+        # Brake and throttle as one signed pedal value (throttle > 0 > brake), throttle winning where the
+        # zones overlap; between the zones the last value is held, like the per-frame mapper does
+        throttling = radius > throttle_min
+        defined = throttling | (radius < brake_max)
+        brake, throttle = pedal_ramps(radius, brake_min, brake_max, throttle_min, throttle_max)
+        pedal = np.where(throttling, curves.throttle.apply(throttle), -curves.brake.apply(brake))
+        last = np.where(defined, frame_index, -1)
+        np.maximum.accumulate(last, axis=1, out=last)
+        pedal = np.take_along_axis(pedal, np.maximum(last, 0), axis=1)
+        pedal[last < 0] = 0.0  # nothing held yet at the start of the session
+        out[sl, :, 1] = np.maximum(pedal, 0.0)
+        out[sl, :, 2] = np.maximum(-pedal, 0.0)
+    return out
@@ -0,0 +1,201 @@
+"""
+Group: Controller Liberators
+Headless end-to-end benchmark.
+
+Runs the real pipeline, frame source -> Detector -> PoseControlMapper -> NullController, optionally with
+off-screen GUI rendering, and reports throughput plus p50/p95/p99 latency of every stage. Results are
+written as JSON so that builds can be compared. The map and control stages only run on frames with a detected
+pose: the synthetic source measures capture and detection only, use a recording of a driver for the full
+pipeline.
+
+Usage:
+    python benchmark.py --source video:Recordings/drive.mp4 --frames 600 --output bench.json
+    python benchmark.py --source synthetic:300 --render --set MediaPipe.model_complexity=0
+"""
+
+import argparse
+import configparser
+import json
+import os
+import platform
+import sys
+import time
+import numpy as np
+
+STAGES = ("read", "convert", "detect", "map", "control", "render", "total")
+
+
+def summarize(samples: np.ndarray) -> dict:
+    """
+    Latency statistics in milliseconds of one stage, NaN samples (stage skipped) are ignored.
+    """
+    ms = samples[~np.isnan(samples)] * 1000.0
+    if ms.size == 0:
+        return {"count": 0}
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {"count": int(ms.size), "mean_ms": float(ms.mean()), "p50_ms": float(p50), "p95_ms": float(p95),
+            "p99_ms": float(p99), "max_ms": float(ms.max())}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Headless end-to-end benchmark of Controller Liberator")
+    parser.add_argument("--config", default="sysconfig.ini", help="configuration file")
+    parser.add_argument("--source", default="synthetic:600",
+                        help="frame source: camera:<i>, video:<path>, images:<dir> or synthetic[:<n>] "
+                             "(synthetic frames contain no pose, map and control are then not measured)")
+    parser.add_argument("--frames", type=int, default=600, help="measured frames (stops earlier at source end)")
+    parser.add_argument("--warmup", type=int, default=30, help="frames run before measuring")
+    parser.add_argument("--realtime", action="store_true", help="pace file sources at their frame rate")
+    parser.add_argument("--render", action="store_true", help="render the GUI off-screen as well")
+    parser.add_argument("--set", action="append", default=[], metavar="SECTION.KEY=VALUE",
+                        help="override a configuration value, can be repeated")
+    parser.add_argument("--output", default="", help="write machine-readable results to this JSON file")
+    return parser.parse_args(argv)
+
+
+def load_config(args) -> configparser.ConfigParser:
+    config = configparser.ConfigParser()
+    config.read(args.config)
+    for override in args.set:
+        key, _, value = override.partition("=")
+        section, _, option = key.partition(".")
+        if not config.has_section(section):
+            config.add_section(section)
+        config.set(section, option, value)
+    return config
+
+
+def run(args) -> dict:
+    if args.render:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # off-screen rendering
+
+    import cv2
+    from context import Context
+    from presets import PresetManager
+    from detector import Detector
+    from mapping import PoseControlMapper
+    from sources import open_source
+    from control.null import NullController
+    from latency import FrameStamp, LatencyTracker
+
+    config = load_config(args)
+    reso, fps = (640, 480), 30
+    ctx = Context(config, headless=True)
+    preset_mgr = PresetManager(ctx)
+    source = open_source(args.source, reso, fps, realtime=args.realtime)
+    gui = None
+    if args.render:
+        from gui import GUI
+        gui = GUI(ctx, reso, fps)
+    detector = Detector(ctx)
+    mapper = PoseControlMapper(ctx)
+    ctx.gamepad = NullController()
+    preset_mgr.load_presets()
+
+    total_frames = args.warmup + args.frames
+    times = np.full((total_frames, len(STAGES)), np.nan)
+    col = {name: i for i, name in enumerate(STAGES)}
+    detected = 0
+    n = 0
+    rgb = None
+    t_measure = None
+    perf = time.perf_counter
+
+    while n < total_frames:
+        if n == args.warmup:
+            ctx.latency = LatencyTracker(capacity=max(1, args.frames))  # trace measured frames only
+            t_measure = perf()
+        row = times[n]
+        t0 = perf()
+        ret, frame = source.read()
+        if not ret:
+            break
+        t1 = perf()
+        stamp = FrameStamp(source.frame_seq, source.frame_timestamp)
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+        t2 = perf()
+        landmarks, vis_frame = detector.get_landmarks(rgb, stamp)
+        t3 = perf()
+        row[col["read"]], row[col["convert"]], row[col["detect"]] = t1 - t0, t2 - t1, t3 - t2
+        t_end = t3
+        feats = mapper.features if landmarks else None  # a repeated result keeps its features on screen
+        if landmarks and detector.fresh:  # repeated results of the tasks backend are not mapped again
+            detected += n >= args.warmup
+            feats = mapper.extract_features(landmarks, detector.last_stamp)
+            t4 = perf()
+            mapper.trigger_control()
+            t_end = perf()
+            row[col["map"]], row[col["control"]] = t4 - t3, t_end - t4
+        if gui:
+            gui.clear_color()
+            gui.render_np_frame(vis_frame)
+            if feats:
+                gui.render_pose_features(feats)
+                gui.render_game_controls(feats)
+            gui.update_display()
+            row[col["render"]] = perf() - t_end
+            t_end = perf()
+        detector.release_frame(vis_frame)  # process pool frames are views into its shared memory
+        row[col["total"]] = t_end - t0
+        n += 1
+    wall = perf() - t_measure if t_measure is not None else 0.0
+
+    source.release()
+    detector.close()
+    ctx.close()
+    if gui:
+        gui.quit()
+
+    measured = times[args.warmup:n]
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "platform": platform.platform(),
+            "python": sys.version.split()[0],
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "source": args.source,
+            "render": args.render,
+            "realtime": args.realtime,
+            "config": {s: dict(config.items(s))
+                       for s in ("Capture", "Runtime", "MediaPipe") if config.has_section(s)},
+        },
+        "frames": len(measured),
+        "detected_frames": detected,
+        "wall_time_s": wall,
+        "throughput_fps": len(measured) / wall if wall > 0 else 0.0,
+        "stages": {name: summarize(measured[:, i]) for i, name in enumerate(STAGES)},
+        "glass_to_control_ms": ctx.latency.summary() if ctx.latency else {},
+    }
+
+
+def print_report(result: dict) -> None:
+    print(f"\nFrames: {result['frames']} ({result['detected_frames']} with pose), "
+          f"throughput: {result['throughput_fps']:.1f} fps")
+    print(f"{'stage':<10}{'count':>8}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}  (ms)")
+    for name, s in result["stages"].items():
+        if not s["count"]:
+            continue
+        print(f"{name:<10}{s['count']:>8}{s['mean_ms']:>10.2f}{s['p50_ms']:>10.2f}"
+              f"{s['p95_ms']:>10.2f}{s['p99_ms']:>10.2f}{s['max_ms']:>10.2f}")
+    skipped = [name for name in ("map", "control") if not result["stages"][name]["count"]]
+    if skipped:
+        print(f"Warning: no pose detected in the measured frames, stages not measured: {', '.join(skipped)}. "
+              "Use a source showing a driver, e.g. --source video:<recording>")
+    total = result["glass_to_control_ms"].get("total_ms")
+    if total:
+        print(f"glass-to-control: p50 {total['p50']:.2f}  p95 {total['p95']:.2f}  p99 {total['p99']:.2f} ms")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    result = run(args)
+    print_report(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Group: Controller Liberators
+Automatic calibration of the mapping thresholds from a short warm-up session.
+
+Instead of dragging the brake, throttle and steering sliders by hand, the user holds a few poses for some
+seconds each while the detections are collected: neutral, full brake, full throttle, full left and full right
+lock. The thresholds are then fitted from the distributions of the steering angle and fist radius of every
+pose with one vectorized quantile call per pose, using the same hand geometry as the mapper:
+- steering safe angle: just above the angles seen while holding the wheel straight
+- steering borders: reached by nearly every frame of the full-lock poses
+- brake radius min / throttle radius max: reached by nearly every frame of the full brake / throttle poses
+- brake radius max / throttle radius min: just outside the neutral radius range, so the relaxed pose holds the
+  pedals
+
+Usage:
+    calibration = AutoCalibration()
+    calibration.feed(stamp.t_capture, landmarks_to_array(landmarks))  # every detection until calibration.done
+    preset = calibration.fit_preset(preset_mgr.active_preset, "calibrated")
+"""
+
+import copy
+from typing import Dict, Optional
+import numpy as np
+from landmarks import NUM_LANDMARKS
+from mapping import hand_geometry
+from presets import Preset
+
+CALIBRATION_POSES = (
+    ("neutral", "Hold the wheel straight with relaxed hands"),
+    ("brake", "Full brake: hold the wheel straight, fists close together"),
+    ("throttle", "Full throttle: hold the wheel straight, fists far apart"),
+    ("left lock", "Full left lock: turn the wheel left as far as you steer"),
+    ("right lock", "Full right lock: turn the wheel right as far as you steer"),
+)
+"""(pose name, prompt) in the order the poses are recorded"""
+
+
+def fit_thresholds(samples: Dict[str, np.ndarray], coverage: float = 0.9, angle_margin: float = 1.0,
+                   pedal_margin: float = 0.15) -> Dict[str, float]:
+    """
+    Fit the preset mapping thresholds from the landmarks recorded in every calibration pose.
+    :param samples: pose name -> (T, 33, 4) landmark array, for every pose of CALIBRATION_POSES
+    :param coverage: share of the frames of a pose that must reach its threshold, the rest is treated as noise
+    :param angle_margin: degrees added to the neutral steering angles for the safe angle
+    :param pedal_margin: share of the gap between the neutral and the full-pedal radius left as dead zone
+    :return: preset mapping dict
+    """
+    missing = [name for name, _ in CALIBRATION_POSES if len(samples.get(name, ())) == 0]
+    if missing:
+        raise ValueError(f"No detections recorded for the calibration poses: {', '.join(missing)}")
+    lo, hi = 1.0 - coverage, coverage
+    stats = {}
+    for name, arr in samples.items():
+        _, angle, radius = hand_geometry(np.asarray(arr, dtype=np.float64))
+        # One call for all statistics of a pose: (angle, |angle|, radius) x (low, median, high) quantiles
+        stats[name] = np.quantile(np.stack((angle, np.abs(angle), radius)), (lo, 0.5, hi), axis=1).T
+
+    safe_angle = stats["neutral"][1, 2] + angle_margin
+    if stats["left lock"][0, 1] >= 0.0 or stats["right lock"][0, 1] <= 0.0:
+        raise ValueError("The left and right lock poses did not turn the wheel to their sides")
+    left_border = stats["left lock"][1, 0] - safe_angle
+    right_border = stats["right lock"][1, 0] - safe_angle
+    brake_min = stats["brake"][2, 2]
+    throttle_max = stats["throttle"][2, 0]
+    neutral_min, neutral_max = stats["neutral"][2, 0], stats["neutral"][2, 2]
+    brake_max = neutral_min - pedal_margin * (neutral_min - brake_min)
+    throttle_min = neutral_max + pedal_margin * (throttle_max - neutral_max)
+
+    if left_border <= 0.0 or right_border <= 0.0:
+        raise ValueError("The full-lock poses did not turn the wheel further than the neutral pose")
+    if not brake_min < neutral_min:
+        raise ValueError("The full-brake fists were not closer together than in the neutral pose")
+    if not neutral_max < throttle_max:
+        raise ValueError("The full-throttle fists were not further apart than in the neutral pose")
+    return {
+        "steering safe angle": round(float(safe_angle), 4),
+        "steering left border": round(float(left_border), 4),
+        "steering right border": round(float(right_border), 4),
+        "brake radius min": round(float(brake_min), 4),
+        "brake radius max": round(float(brake_max), 4),
+        "throttle radius min": round(float(throttle_min), 4),
+        "throttle radius max": round(float(throttle_max), 4),
+    }
+
+
+class AutoCalibration:
+    """
+    Guide the user through the calibration poses and collect the detections of each.
+    """
+
+    def __init__(self, settle: float = 1.5, hold: float = 3.0, coverage: float = 0.9, angle_margin: float = 1.0,
+                 pedal_margin: float = 0.15):
+        self.settle: float = settle  # seconds to get into a pose, not recorded
+        self.hold: float = hold  # seconds recorded per pose
+        self.coverage: float = coverage  # see fit_thresholds
+        self.angle_margin: float = angle_margin  # see fit_thresholds
+        self.pedal_margin: float = pedal_margin  # see fit_thresholds
+        self.samples: Dict[str, list] = {name: [] for name, _ in CALIBRATION_POSES}  # pose -> (33, 4) arrays
+        self._pose: int = 0  # index of the current pose in CALIBRATION_POSES
+        self._t_start: Optional[float] = None  # when the current pose started
+
+    @property
+    def done(self) -> bool:
+        return self._pose >= len(CALIBRATION_POSES)
+
+    @property
+    def prompt(self) -> str:
+        """Instruction for the current pose, with the state of its recording."""
+        if self.done:
+            return "Calibration finished"
+        name, text = CALIBRATION_POSES[self._pose]
+        step = f"[{self._pose + 1}/{len(CALIBRATION_POSES)}] {text}"
+        if self._t_start is None:
+            return step
+        return f"{step} - recording" if len(self.samples[name]) else f"{step} - get ready"
+
+    def feed(self, t: float, arr: np.ndarray) -> bool:
+        """
+        Collect one detection.
+        :param t: capture time of the frame in seconds
+        :param arr: (33, 4) landmark array
+        :return: whether all poses have been recorded
+        """
+        if self.done:
+            return True
+        if self._t_start is None:
+            self._t_start = t
+        elapsed = t - self._t_start
+        name = CALIBRATION_POSES[self._pose][0]
+        if elapsed >= self.settle:
+            self.samples[name].append(np.array(arr, dtype=np.float32))
+        if elapsed >= self.settle + self.hold:
+            print(f"Calibration pose '{name}': {len(self.samples[name])} frames")
+            self._pose += 1
+            self._t_start = None
+        return self.done
+
+    def fit(self) -> Dict[str, float]:
+        """Fitted preset mapping dict, see fit_thresholds."""
+        samples = {name: np.stack(arrs) if arrs else np.empty((0, NUM_LANDMARKS, 4))
+                   for name, arrs in self.samples.items()}
+        return fit_thresholds(samples, self.coverage, self.angle_margin, self.pedal_margin)
+
+    def fit_preset(self, base: Preset, name: str) -> Preset:
+        """
+        A preset with the fitted mapping and the other settings of base.
+        """
+        preset = copy.deepcopy(base)
+        preset.name = name
+        preset.mapping = self.fit()
+        return preset
+
+
+def calibrate_replay(replay, calibration: AutoCalibration) -> AutoCalibration:
+    """
+    Feed a recorded warm-up session (a LandmarkReplay) through a calibration, e.g. to refit it with other
+    coverage settings. The poses must have been held in the order and timing of the calibration.
+    """
+    for t, arr in zip(replay.timestamps, replay.landmarks):
+        if calibration.feed(float(t), arr):
+            break
+    return calibration
@@ -0,0 +1,162 @@
+"""
+Group: Controller Liberators
+Camera capture running on a dedicated thread.
+
+The capture thread keeps draining the device so that the driver queue never fills with stale frames.
+Only the newest frame is held (latest-frame-wins); a frame overwritten before anyone consumed it is
+counted as dropped, so the detector always works on the freshest image available.
+
+Frames are read into a fixed set of three buffers (triple buffering: one being written, the newest one,
+and the one handed to the consumer), so steady-state capture does not allocate. FramePool provides the
+same reuse for the downstream stages.
+
+Usage:
+    from capture import ThreadedCapture
+
+    camera = ThreadedCapture(cv2.VideoCapture(0)).start()
+    ret, frame = camera.read()
+    ...
+    camera.release()
+"""
+
+import threading
+import time
+from collections import deque
+import numpy as np
+
+
+class FramePool:
+    """
+    Free list of equally shaped frame buffers, allocating only when none is free.
+    """
+
+    def __init__(self, shape: tuple = None, dtype=np.uint8, size: int = 0):
+        self.shape: tuple = shape  # buffer shape, fixed by the first acquire_like() when None
+        self.dtype = dtype
+        self._free = deque()
+        self._lock = threading.Lock()
+        self.allocated_count: int = 0  # buffers allocated so far
+        if shape is not None:
+            for _ in range(size):
+                self._free.append(self._allocate())
+
+    def _allocate(self) -> np.ndarray:
+        self.allocated_count += 1
+        return np.empty(self.shape, dtype=self.dtype)
+
+    def acquire(self) -> np.ndarray:
+        """Take a buffer out of the pool."""
+        with self._lock:
+            return self._free.pop() if self._free else self._allocate()
+
+    def acquire_like(self, frame: np.ndarray) -> np.ndarray:
+        """Take a buffer shaped like the frame, resetting the pool if the frame shape changed."""
+        with self._lock:
+            if frame.shape != self.shape or frame.dtype != self.dtype:
+                self.shape, self.dtype = frame.shape, frame.dtype
+                self._free.clear()
+            return self._free.pop() if self._free else self._allocate()
+
+    def release(self, buf: np.ndarray) -> None:
+        """Return a buffer to the pool, buffers of a different shape are left to the garbage collector."""
+        if buf is None:
+            return
+        with self._lock:
+            if buf.shape == self.shape and buf.dtype == self.dtype:
+                self._free.append(buf)
+
+
+class ThreadedCapture:
+    """
+    Wrap a capture device (anything with cv2.VideoCapture-like read() / release()) with a background reader.
+    """
+
+    def __init__(self, device, read_timeout: float = 2.0):
+        self.device = device  # wrapped capture device
+        self.read_timeout: float = read_timeout  # max seconds read() waits for a new frame
+
+        self._cond = threading.Condition()
+        self._thread: threading.Thread = None
+        self._running: bool = False
+
+        self._buffers = [None, None, None]  # triple buffer of captured frames
+        self._latest: int = -1  # buffer index of the newest frame
+        self._held: int = -1  # buffer index of the frame handed to the consumer
+        self._frame_ts: float = 0.0  # monotonic capture timestamp of the newest frame
+        self._seq: int = 0  # sequence number of the newest frame
+        self._consumed_seq: int = 0  # sequence number of the last frame handed out by read()
+
+        self.captured_count: int = 0  # frames read from the device
+        self.dropped_count: int = 0  # frames overwritten before being consumed
+        self.frame_seq: int = 0  # sequence number of the frame last returned by read()
+        self.frame_timestamp: float = 0.0  # capture timestamp of the frame last returned by read()
+
+    def start(self) -> "ThreadedCapture":
+        """
+        Start the capture thread, return self for chaining.
+        """
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._capture_loop, name="capture", daemon=True)
+        self._thread.start()
+        return self
+
+    def _capture_loop(self) -> None:
+        while self._running:
+            with self._cond:
+                write = next(i for i in range(3) if i != self._latest and i != self._held)
+            ret, frame = self.device.read(image=self._buffers[write])  # reuses the buffer when shapes match
+            ts = time.perf_counter()
+            with self._cond:
+                if not ret:
+                    self._running = False
+                    self._cond.notify_all()
+                    break
+                if self._latest >= 0 and self._seq != self._consumed_seq:
+                    self.dropped_count += 1
+                self._buffers[write] = frame
+                self._latest = write
+                self._frame_ts = ts
+                self._seq += 1
+                self.captured_count += 1
+                self._cond.notify_all()
+
+    def read(self):
+        """
+        Block until a frame newer than the last returned one is available.
+        Returns (ret, frame) like cv2.VideoCapture.read(); ret is False when the device stopped delivering.
+        The frame buffer stays valid until the next call of read().
+        """
+        with self._cond:
+            ready = self._cond.wait_for(lambda: self._seq != self._consumed_seq or not self._running,
+                                        timeout=self.read_timeout)
+            if not ready or self._seq == self._consumed_seq:
+                return False, None
+            self._consumed_seq = self._seq
+            self.frame_seq = self._seq
+            self.frame_timestamp = self._frame_ts
+            self._held = self._latest
+            return True, self._buffers[self._held]
+
+    def is_running(self) -> bool:
+        return self._running
+
+    def set(self, prop_id: int, value) -> bool:
+        """Forward a property to the wrapped device."""
+        return self.device.set(prop_id, value)
+
+    def get(self, prop_id: int):
+        """Query a property of the wrapped device."""
+        return self.device.get(prop_id)
+
+    def release(self) -> None:
+        """
+        Stop the capture thread and release the wrapped device.
+        """
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=self.read_timeout)
+            self._thread = None
+        self.device.release()
+        print(f"Capture stopped: {self.captured_count} frames captured, {self.dropped_count} dropped")
@@ -0,0 +1,121 @@
+"""
+Group: Controller Liberators
+Camera capture profiles and automatic probing.
+
+A capture profile is a requested camera mode, written as WIDTHxHEIGHT@FPS[:FOURCC] in sysconfig.ini,
+e.g. "640x480@60:MJPG". Probing opens the camera with every candidate profile, measures the frame rate
+that is really delivered and the time spent blocking in read(), and picks the fastest profile that
+meets the target frame rate. Driver defaults often buffer one frame or more, so a good profile together
+with a small CAP_PROP_BUFFERSIZE directly cuts input latency.
+"""
+
+import time
+from typing import List, Optional
+
+
+class CaptureProfile:
+    """
+    Requested camera mode.
+    """
+
+    def __init__(self, resolution: tuple, fps: float, fourcc: str = ""):
+        self.resolution: tuple = resolution  # (width, height)
+        self.fps: float = fps  # requested frame rate
+        self.fourcc: str = fourcc  # requested codec, e.g. MJPG or YUYV, blank for the driver default
+
+    @classmethod
+    def parse(cls, text: str) -> "CaptureProfile":
+        """Parse 'WIDTHxHEIGHT@FPS[:FOURCC]'."""
+        mode, _, fourcc = text.strip().partition(":")
+        size, _, fps = mode.partition("@")
+        width, _, height = size.lower().partition("x")
+        return cls((int(width), int(height)), float(fps or 30), fourcc.strip().upper())
+
+    def __str__(self):
+        fourcc = f":{self.fourcc}" if self.fourcc else ""
+        return f"{self.resolution[0]}x{self.resolution[1]}@{self.fps:g}{fourcc}"
+
+
+def parse_profiles(text: str) -> List[CaptureProfile]:
+    """Parse a comma separated list of capture profiles."""
+    return [CaptureProfile.parse(p) for p in text.split(",") if p.strip()]
+
+
+class ProbeResult:
+    """
+    Measurements of one probed capture profile.
+    """
+
+    def __init__(self, profile: CaptureProfile):
+        self.profile: CaptureProfile = profile
+        self.opened: bool = False
+        self.actual_resolution: tuple = (0, 0)  # resolution delivered by the driver
+        self.actual_fourcc: str = ""  # codec used by the driver
+        self.delivered_fps: float = 0.0  # measured frame rate
+        self.read_ms: float = 0.0  # mean time blocking in read()
+
+    def meets(self, target_fps: float, tolerance: float = 0.9) -> bool:
+        """Whether the profile delivered the requested resolution at the target frame rate."""
+        return (self.opened and self.actual_resolution == tuple(self.profile.resolution)
+                and self.delivered_fps >= target_fps * tolerance)
+
+    def __str__(self):
+        if not self.opened:
+            return f"{self.profile}: cannot open"
+        return (f"{self.profile}: got {self.actual_resolution[0]}x{self.actual_resolution[1]} "
+                f"{self.actual_fourcc or '?'}, {self.delivered_fps:.1f} fps, read {self.read_ms:.2f} ms")
+
+
+def probe_profile(index: int, profile: CaptureProfile, buffer_size: int = 1, frames: int = 30,
+                  warmup_frames: int = 5) -> ProbeResult:
+    """
+    Open the camera with the profile and measure its delivered frame rate and read latency.
+    """
+    from sources import CameraSource
+    result = ProbeResult(profile)
+    camera = CameraSource(index, profile.resolution, profile.fps, profile.fourcc, buffer_size)
+    try:
+        if not camera.isOpened():
+            return result
+        for _ in range(warmup_frames):  # let exposure and the driver queue settle
+            if not camera.read()[0]:
+                return result
+        result.opened = True
+        result.actual_resolution = camera.actual_resolution
+        result.actual_fourcc = camera.actual_fourcc
+        read_time = 0.0
+        frame = None
+        t_start = time.perf_counter()
+        for _ in range(frames):
+            t0 = time.perf_counter()
+            ret, frame = camera.read(image=frame)
+            read_time += time.perf_counter() - t0
+            if not ret:
+                result.opened = False
+                return result
+        elapsed = time.perf_counter() - t_start
+        result.delivered_fps = frames / elapsed if elapsed > 0 else 0.0
+        result.read_ms = read_time * 1000.0 / frames
+        return result
+    finally:
+        camera.release()
+
+
+def probe_profiles(index: int, profiles: List[CaptureProfile], target_fps: float, buffer_size: int = 1,
+                   frames: int = 30) -> Optional[CaptureProfile]:
+    """
+    Probe every candidate and return the fastest profile meeting the target frame rate, or None.
+    Ties are broken by the shorter read time, then by the order of the candidates.
+    """
+    print(f"Probing {len(profiles)} capture profiles of camera {index} (target {target_fps:g} fps)...")
+    results = []
+    for profile in profiles:
+        result = probe_profile(index, profile, buffer_size, frames)
+        print(f"  {result}")
+        results.append(result)
+    candidates = [r for r in results if r.meets(target_fps)]
+    if not candidates:
+        return None
+    best = min(candidates, key=lambda r: (-round(r.delivered_fps), r.read_ms))
+    print(f"Selected capture profile: {best.profile}")
+    return best.profile
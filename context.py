@@ -2,25 +2,42 @@
 Group: Controller Liberators
 """
 from utils import check_os
-if check_os() != "Darwin":
-    from tkparam import TKParamWindow
+from profiler import Profiler
+from param_store import ParamStore
 
 
 class Context:
     """
     Application context storing component references.
     """
-    def __init__(self, config):
+    def __init__(self, config, headless: bool = False, defer_tkparam: bool = False):
+        """
+        :param headless: no calibration window, e.g. benchmarks, tests and player processes
+        :param defer_tkparam: do not open the calibration window yet, open_tkparam() is called later,
+            e.g. on a startup thread
+        """
         self.cfg = config  # configuration object reference
         self.detector = None  # pose detector instance
         self.gui = None  # GUI window reference
         self.preset_mgr = None  # GUI settings reference
         self.mapper = None  # pose-control mapper instance
         self.gamepad = None  # virtual gamepad reference
-        if check_os() != "Darwin":
-            self.tkparam = TKParamWindow(title="Controller Liberators Calibration")  # tkparam window reference
-        else:
-            self.tkparam = None
+        self.latency = None  # glass-to-control latency tracker, None when tracing is disabled
+        self.profiler = Profiler(config.getboolean("Profiling", "enabled", fallback=False))  # stage profiler
+        self.headless: bool = headless  # no calibration window, e.g. benchmarks and tests
+        self.params = ParamStore()  # tuning parameters shared by presets, calibration window and mapper
+        self.tkparam = None  # tkparam window reference, None without calibration window
+        if not defer_tkparam:
+            self.open_tkparam()
+
+    def open_tkparam(self) -> None:
+        """
+        Open the calibration window, unless headless or on macOS. Returns once the window's Tk root exists,
+        so that it can be called on a startup thread and the window used right after.
+        """
+        if not self.headless and check_os() != "Darwin":
+            from tkparam import TKParamWindow
+            self.tkparam = TKParamWindow(title="Controller Liberators Calibration", store=self.params)
 
     @property
     def active_preset(self):
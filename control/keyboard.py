@@ -9,7 +9,10 @@ from pynput.keyboard import Controller
 
 
 class KeyboardController(VRacingController):
-    def __init__(self):
+    def __init__(self, keys: dict = None):
+        """
+        :param keys: optional key mapping overriding the defaults, e.g. {"left": "j", "right": "l"} for a second player
+        """
         self.keyboard = Controller()
         self.steering_keys = {
             "left": "a",
@@ -17,6 +20,7 @@ class KeyboardController(VRacingController):
             "throttle": "w",
             "brake": "s"
         }
+        self.steering_keys.update(keys or {})
         self.is_steer_left = False
         self.is_steer_right = False
         self.is_throttle = False
@@ -0,0 +1,31 @@
+"""
+Group: Controller Liberators
+This code provides a virtual controller that sends nothing.
+For benchmarks, replays and machines without a controller backend.
+"""
+
+from control.controller import VRacingController
+
+
+class NullController(VRacingController):
+    """
+    Controller keeping the latest values instead of emitting them.
+    """
+
+    def __init__(self):
+        self.steer_value: float = 0.0
+        self.throttle_value: float = 0.0
+        self.brake_value: float = 0.0
+        self.emit_count: int = 0  # number of control calls received
+
+    def steer(self, value: float):
+        self.steer_value = value
+        self.emit_count += 1
+
+    def throttle(self, value: float):
+        self.throttle_value = value
+        self.emit_count += 1
+
+    def brake(self, value: float):
+        self.brake_value = value
+        self.emit_count += 1
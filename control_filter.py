@@ -0,0 +1,156 @@
+"""
+Group: Controller Liberators
+Jitter filtering and latency compensation of the tracked hand positions.
+
+Raw landmark positions jitter by a few pixels, which makes the steering angle and the fist distance flicker
+around the brake and throttle thresholds. The mapper therefore passes the two hand centers through a
+filter before the control values are derived from them:
+- one_euro: One Euro filter, strong smoothing at rest and little lag when the hands move fast
+- kalman: constant-velocity Kalman filter per coordinate
+Both also estimate the hand velocity, which the predictor uses to extrapolate the hands by the measured
+pipeline latency (capture to mapping), so that filtering lowers the effective input lag instead of adding
+to it. Settings are stored in the "filter" section of each preset.
+"""
+
+import math
+from typing import Optional
+import numpy as np
+
+
+class OneEuroFilter:
+    """
+    One Euro filter (Casiez et al. 2012) over a vector of coordinates.
+    """
+
+    def __init__(self, min_cutoff: float = 1.0, beta: float = 0.0, d_cutoff: float = 1.0):
+        self.min_cutoff: float = min_cutoff  # cutoff frequency in Hz at rest, lower = smoother
+        self.beta: float = beta  # cutoff increase per unit of speed, higher = less lag on fast motion
+        self.d_cutoff: float = d_cutoff  # cutoff frequency in Hz of the velocity estimate
+        self.x: Optional[np.ndarray] = None  # filtered position
+        self.dx: Optional[np.ndarray] = None  # filtered velocity per second
+        self._t: float = 0.0
+
+    @staticmethod
+    def _alpha(dt: float, cutoff):
+        tau = 1.0 / (2.0 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def reset(self) -> None:
+        self.x = self.dx = None
+
+    def __call__(self, t: float, x: np.ndarray) -> np.ndarray:
+        if self.x is None:
+            self.x, self.dx, self._t = x.astype(np.float64), np.zeros(x.shape), t
+            return self.x
+        dt = t - self._t
+        if dt <= 0.0:
+            return self.x
+        self._t = t
+        a_d = self._alpha(dt, self.d_cutoff)
+        self.dx += a_d * ((x - self.x) / dt - self.dx)
+        a = self._alpha(dt, self.min_cutoff + self.beta * np.abs(self.dx))
+        self.x += a * (x - self.x)
+        return self.x
+
+
+class KalmanFilter:
+    """
+    Constant-velocity Kalman filter, one independent (position, velocity) state per coordinate.
+    """
+
+    def __init__(self, process_noise: float = 0.3, measurement_noise: float = 1e-5):
+        self.q: float = process_noise  # acceleration noise density, higher = follows changes faster
+        self.r: float = measurement_noise  # variance of the measured positions
+        self.x: Optional[np.ndarray] = None  # filtered position
+        self.dx: Optional[np.ndarray] = None  # filtered velocity per second
+        self._p00 = self._p01 = self._p11 = None  # state covariance per coordinate
+        self._t: float = 0.0
+
+    def reset(self) -> None:
+        self.x = self.dx = None
+
+    def __call__(self, t: float, z: np.ndarray) -> np.ndarray:
+        if self.x is None:
+            self.x, self.dx, self._t = z.astype(np.float64), np.zeros(z.shape), t
+            self._p00, self._p01, self._p11 = np.full(z.shape, self.r), np.zeros(z.shape), np.ones(z.shape)
+            return self.x
+        dt = t - self._t
+        if dt <= 0.0:
+            return self.x
+        self._t = t
+        q = self.q
+        # Predict
+        self.x += self.dx * dt
+        p00 = self._p00 + dt * (2.0 * self._p01 + dt * self._p11) + q * dt ** 3 / 3.0
+        p01 = self._p01 + dt * self._p11 + q * dt ** 2 / 2.0
+        p11 = self._p11 + q * dt
+        # Update
+        s = p00 + self.r
+        k0, k1 = p00 / s, p01 / s
+        y = z - self.x
+        self.x += k0 * y
+        self.dx += k1 * y
+        self._p00, self._p01, self._p11 = (1.0 - k0) * p00, (1.0 - k0) * p01, p11 - k1 * p01
+        return self.x
+
+
+class HandFilter:
+    """
+    Filter and latency-compensating predictor of the hand centers, configured from a preset.
+    """
+
+    MAX_GAP = 0.5  # seconds without detection after which the filter restarts
+
+    def __init__(self):
+        self.filter = None  # OneEuroFilter, KalmanFilter or None to pass positions through
+        self.prediction: float = 0.0  # share of the measured latency to extrapolate, 0 to disable
+        self.prediction_max: float = 0.1  # longest extrapolation in seconds
+        self.prediction_min_speed: float = 0.05  # speeds below this (units per second) are not extrapolated
+        self.latency: float = 0.0  # smoothed capture-to-mapping latency in seconds
+        self._last_t: Optional[float] = None
+        self._out = np.zeros(4)
+
+    def configure(self, settings: dict) -> None:
+        """
+        Apply the "filter" settings of a preset.
+        """
+        kind = settings.get("type", "none")
+        if kind == "one_euro":
+            self.filter = OneEuroFilter(settings.get("min cutoff", 1.0), settings.get("beta", 20.0),
+                                        settings.get("derivative cutoff", 3.0))
+        elif kind == "kalman":
+            self.filter = KalmanFilter(settings.get("process noise", 0.3), settings.get("measurement noise", 1e-5))
+        elif kind == "none":
+            self.filter = None
+        else:
+            raise ValueError(f"Unknown filter type '{kind}', expected none, one_euro or kalman")
+        self.prediction = settings.get("prediction", 0.0)
+        self.prediction_max = settings.get("prediction max ms", 100.0) / 1000.0
+        self.prediction_min_speed = settings.get("prediction min speed", 0.05)
+        self._last_t = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.filter is not None
+
+    def process(self, t: float, latency: float, centers) -> np.ndarray:
+        """
+        Filter the hand centers measured at time t and extrapolate them by the pipeline latency.
+        :param t: capture time of the frame in seconds
+        :param latency: seconds from capture of the frame until now
+        :param centers: (left x, left y, right x, right y) raw hand centers
+        :return: filtered and predicted (left x, left y, right x, right y)
+        """
+        if self._last_t is None or t - self._last_t > self.MAX_GAP:
+            self.filter.reset()
+            self.latency = latency
+        self._last_t = t
+        self.latency += 0.1 * (latency - self.latency)
+        x = self.filter(t, np.asarray(centers, dtype=np.float64))
+        if not self.prediction:
+            return x
+        # Extrapolate by the speed above the deadband only, velocity noise would otherwise shake resting hands
+        dx = self.filter.dx
+        speed = np.maximum(np.abs(dx) - self.prediction_min_speed, 0.0)
+        horizon = min(self.prediction * self.latency, self.prediction_max)
+        return np.add(x, np.copysign(speed, dx) * horizon, out=self._out)
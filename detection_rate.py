@@ -0,0 +1,88 @@
+"""
+Group: Controller Liberators
+Adaptive detection rate.
+
+Runs the full pose graph only every N frames. N grows when inference is expensive compared with the frame
+interval and shrinks when the hands move fast, landmarks of the skipped frames are extrapolated from the
+detection history so that the mapper still receives a landmark set every frame.
+"""
+
+import math
+import time
+from landmarks import LandmarkHistory
+
+
+class AdaptiveDetectionRate:
+    """
+    Decide per frame whether to run inference, and estimate landmarks for the frames in between.
+    """
+
+    def __init__(self, max_interval: int = 4, target_load: float = 0.5, max_drift: float = 0.02,
+                 track_indices=None, ema_alpha: float = 0.2):
+        self.max_interval: int = max(1, max_interval)  # run inference at least every max_interval frames
+        self.target_load: float = target_load  # fraction of the frame interval inference may use on average
+        self.max_drift: float = max_drift  # tolerated landmark drift between detections (normalized units)
+        self.track_indices = track_indices  # landmarks whose velocity drives the rate, None for all
+        self.ema_alpha: float = ema_alpha
+
+        self.history = LandmarkHistory()
+        self.interval: int = 1  # current detection interval N
+        self.infer_time: float = 0.0  # smoothed inference latency in seconds
+        self.frame_time: float = 1.0 / 30.0  # smoothed interval between frames in seconds
+        self.inferred_count: int = 0
+        self.skipped_count: int = 0
+        self._since_inference: int = 0
+        self._last_frame_ts: float = None
+
+    def _ema(self, old: float, new: float) -> float:
+        return old + self.ema_alpha * (new - old)
+
+    def begin_frame(self) -> float:
+        """
+        Register a new frame, return its timestamp.
+        """
+        now = time.perf_counter()
+        if self._last_frame_ts is not None:
+            self.frame_time = self._ema(self.frame_time, now - self._last_frame_ts)
+        self._last_frame_ts = now
+        return now
+
+    def should_infer(self) -> bool:
+        """
+        Whether inference should run on the current frame.
+        """
+        if len(self.history) == 0 or self._since_inference + 1 >= self.interval:
+            return True
+        self._since_inference += 1
+        self.skipped_count += 1
+        return False
+
+    def on_inference(self, t: float, arr, infer_time: float) -> None:
+        """
+        Feed back an inference result (arr is a (33, 4) landmark array, or None when no pose was detected).
+        """
+        self._since_inference = 0
+        self.inferred_count += 1
+        self.infer_time = infer_time if self.inferred_count == 1 else self._ema(self.infer_time, infer_time)
+        if arr is None:
+            # Lost the pose: nothing to extrapolate from, detect every frame until it is found again
+            self.history.clear()
+            self.interval = 1
+            return
+        self.history.add(t, arr)
+        self._update_interval()
+
+    def _update_interval(self) -> None:
+        frame_time = max(self.frame_time, 1e-3)
+        # Smallest interval keeping the average inference cost within the load target
+        n_load = math.ceil(self.infer_time / (self.target_load * frame_time))
+        # Largest interval keeping the expected drift between detections within tolerance
+        speed = self.history.velocity(self.track_indices)
+        n_drift = self.max_interval if speed <= 0.0 else int(self.max_drift / (speed * frame_time))
+        self.interval = max(1, min(self.max_interval, max(min(n_drift, self.max_interval), n_load)))
+
+    def estimate(self, t: float):
+        """
+        Estimated (33, 4) landmark array at time t, or None without detection history.
+        """
+        return self.history.estimate(t)
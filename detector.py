@@ -9,6 +9,12 @@ Features:
 - Guarded imports with graceful degradation if dependencies missing
 - Cross-platform support (macOS, Windows, Linux)
 - Configurable via sysconfig.ini
+- Optional process pool inference for heavy models (see pose_pool.py)
+- Optional adaptive detection rate with landmark extrapolation (see detection_rate.py)
+- Optional optical-flow hand tracking between detections (see flow_tracker.py)
+- Optional region-of-interest cropping and downscaled inference (see roi.py)
+- Optional runtime model complexity switching (see governor.py)
+- Optional non-blocking MediaPipe Tasks PoseLandmarker backend (see pose_landmarker.py)
 - Preset-aware visualization settings
 
 Usage:
@@ -19,6 +25,9 @@ Usage:
     detector = Detector(ctx)
     landmarks, visual_frame = detector.get_landmarks(rgb_frame)
 """
+import time
+from collections import deque
+from typing import Optional
 import numpy as np
 
 try:
@@ -35,6 +44,13 @@ except Exception:
     cv2 = None
     _HAS_CV2 = False
 from context import Context
+from landmarks import landmarks_to_array, array_to_landmarks
+from detection_rate import AdaptiveDetectionRate
+from roi import RoiTracker
+from flow_tracker import FlowHandTracker
+from governor import QualityGovernor
+from latency import FrameStamp
+from mapping import PoseControlMapper
 
 
 class Detector:
@@ -65,7 +81,7 @@ class Detector:
         
         # Load config from context
         cfg = ctx.cfg["MediaPipe"]
-        self.pose = self.mp_pose.Pose(
+        self.pose_kwargs = dict(
             static_image_mode=False,  # False表示视频流模式，True表示静态图像模式
             model_complexity=cfg.getint("model_complexity"),
             smooth_landmarks=cfg.getboolean("smooth_landmarks"),
@@ -75,10 +91,97 @@ class Detector:
             min_tracking_confidence=cfg.getfloat("min_tracking_confidence")
         )
 
-    def get_landmarks(self, frame):
+        # Frame stamps for latency tracing
+        self.last_stamp: Optional[FrameStamp] = None  # stamp of the frame the last landmarks belong to
+        self.fresh: bool = True  # False when the last call repeated an earlier result (tasks backend)
+        self._stamp: Optional[FrameStamp] = None  # stamp of the frame being detected
+        self._pool_stamps = deque()  # stamps of the frames in flight in the process pool
+
+        # Spread inference over worker processes, or run a single graph in-process
+        self.pool = None
+        self.live = None
+        self.governor = None
+        inference_workers = cfg.getint("inference_workers", fallback=0)
+        if cfg.get("backend", fallback="solutions") == "tasks":
+            # Asynchronous PoseLandmarker, never blocks the caller on inference
+            from pose_landmarker import LiveStreamPose
+            self.live = LiveStreamPose(
+                cfg.get("tasks_model", fallback="Models/pose_landmarker_full.task"),
+                min_detection_confidence=cfg.getfloat("min_detection_confidence"),
+                min_presence_confidence=cfg.getfloat("min_detection_confidence"),
+                min_tracking_confidence=cfg.getfloat("min_tracking_confidence"),
+            )
+            self.pose = None
+        elif inference_workers > 0:
+            from pose_pool import PosePool
+            self.pool = PosePool(self.pose_kwargs, inference_workers)
+            self.pose = None
+        elif cfg.getboolean("quality_governor", fallback=False):
+            # Switch model complexity at runtime to hold the inference latency budget, the governor builds
+            # the graphs of all levels itself
+            self.governor = QualityGovernor(
+                self.mp_pose, self.pose_kwargs,
+                budget_ms=cfg.getfloat("governor_budget_ms", fallback=25.0),
+                hysteresis=cfg.getfloat("governor_hysteresis", fallback=0.15),
+                dwell_frames=cfg.getint("governor_dwell_frames", fallback=30),
+                min_confidence=cfg.getfloat("governor_min_confidence", fallback=0.6),
+                track_indices=PoseControlMapper.hand_indices,
+            )
+            self.pose = self.governor.pose
+        else:
+            self.pose = self.mp_pose.Pose(**self.pose_kwargs)
+
+        # Optionally infer on a tracked upper-body region and/or a downscaled image (in-process graph only)
+        self.roi = None
+        roi_tracking = cfg.getboolean("roi_tracking", fallback=False)
+        if self.pose and (roi_tracking or cfg.getint("inference_max_side", fallback=0)):
+            self.roi = RoiTracker(
+                PoseControlMapper.hand_indices + PoseControlMapper.body_shoulder_indices,
+                margin=cfg.getfloat("roi_margin", fallback=0.25),
+                max_side=cfg.getint("inference_max_side", fallback=0),
+            )
+            if not roi_tracking:
+                self.roi.full_frame_ratio = 0.0  # downscale only, never crop
+
+        # Optionally follow the hands with optical flow and run inference only to re-seed (in-process graph only)
+        self.flow = None
+        if self.pose and cfg.getboolean("flow_tracking", fallback=False):
+            self.flow = FlowHandTracker(
+                PoseControlMapper.hand_indices,
+                reseed_interval=cfg.getint("flow_reseed_interval", fallback=4),
+                max_side=cfg.getint("flow_max_side", fallback=160),
+                min_confidence=cfg.getfloat("flow_min_confidence", fallback=0.75),
+            )
+
+        # Optionally run inference only every N frames, N adapting to inference cost and hand speed (in-process
+        # graph only, pool results belong to earlier frames and would skew the cost and the extrapolation)
+        self.rate = None
+        if self.pose and not self.flow and cfg.getboolean("adaptive_rate", fallback=False):
+            self.rate = AdaptiveDetectionRate(
+                max_interval=cfg.getint("adaptive_max_interval", fallback=4),
+                target_load=cfg.getfloat("adaptive_target_load", fallback=0.5),
+                max_drift=cfg.getfloat("adaptive_max_drift", fallback=0.02),
+                track_indices=PoseControlMapper.hand_indices,
+            )
+
+    def warm_up(self, shape: tuple) -> None:
+        """
+        Run the in-process graph once on a black frame, so that the first camera frame does not pay for
+        loading the model.
+        :param shape: (height, width, 3) shape of the frames to come
+        """
+        if getattr(self, 'disabled', False) or self.pose is None:
+            return
+        with self.ctx.profiler.span("pose.warm_up"):
+            self.pose.process(np.zeros(shape, dtype=np.uint8))
+
+    def get_landmarks(self, frame, stamp: FrameStamp = None):
         """
         Use the detector instance to detect user pose of upper body, obtain and return landmarks.
         :param frame: frame in RGB format
+        :param stamp: optional FrameStamp of the frame; the stamp of the frame the returned landmarks belong
+            to is kept in last_stamp (with process pool inference it is an earlier frame); fresh is False when
+            the tasks backend had no new result and repeated the previous one, which callers should not map again
         Returns:
             tuple: (landmarks, visual_frame)
                 - landmarks: landmarks detected by MediaPipe, or None if no pose detected
@@ -91,24 +194,124 @@ class Detector:
                 "https://google.github.io/mediapipe/getting_started/python.html"
             )
 
-        frame.flags.writeable = False
-        results = self.pose.process(frame)
-        frame.flags.writeable = True
+        self._stamp = stamp
+        self.last_stamp = stamp
+        self.fresh = True
+        result = self._detect(frame)
+        if self.last_stamp is not None and self.fresh:
+            self.last_stamp.t_detected = time.perf_counter()
+        return result
+
+    def release_frame(self, frame) -> bool:
+        """
+        Hand back a frame returned by get_landmarks() once it has been displayed. With process pool inference it
+        is a view into a shared memory slot, which the pool reuses afterwards; other frames are left alone.
+        :return: whether the frame belonged to the pool
+        """
+        return self.pool is not None and self.pool.release(frame)
+
+    def _detect(self, frame):
+        if self.flow is not None:
+            return self._visualize(*self._track(frame))
+        if self.rate is None:
+            return self._visualize(*self._infer(frame))
+
+        # Adaptive rate: skipped frames get landmarks extrapolated from the detection history
+        t = self.rate.begin_frame()
+        if not self.rate.should_infer():
+            return self._visualize(array_to_landmarks(self.rate.estimate(t)), frame)
+        t0 = time.perf_counter()
+        landmarks, frame = self._infer(frame)
+        arr = landmarks_to_array(landmarks) if landmarks else None
+        self.rate.on_inference(t, arr, time.perf_counter() - t0)
+        return self._visualize(landmarks, frame)
+
+    def _track(self, frame):
+        """
+        Hand landmarks from optical flow, falling back to inference to re-seed the tracker.
+        """
+        if not self.flow.should_reseed():
+            with self.ctx.profiler.span("flow.track"):
+                arr = self.flow.track(frame)
+            if arr is not None:
+                return array_to_landmarks(arr), frame
+        landmarks, frame = self._infer(frame)
+        if landmarks:
+            self.flow.seed(frame, landmarks_to_array(landmarks))
+        else:
+            self.flow.reset()
+        return landmarks, frame
+
+    def _infer(self, frame):
+        """
+        Run pose inference on the frame, return (landmarks, frame the landmarks belong to).
+        """
+        if self.live:
+            # The newest result available, from this or an earlier frame; the current frame is displayed.
+            # Without a new result the previous one is repeated with its stamp, so the overlay keeps showing it
+            self.live.submit(frame, self._stamp)
+            landmarks, self.last_stamp, self.fresh = self.live.poll()
+            return landmarks, frame
 
-        calibration_mode = self.ctx.gui.calibration_mode
-        show_cam_capture = self.ctx.gui.show_cam_capture
-        show_pose_estimation = self.ctx.gui.show_pose_estimation
+        if self.pool:
+            # Results come back in submission order, one pool depth behind the newest frame
+            self._pool_stamps.append(self._stamp)
+            self.pool.submit(frame)
+            if self.pool.in_flight < self.pool.workers:
+                return None, frame
+            self.last_stamp = self._pool_stamps.popleft()
+            with self.ctx.profiler.span("pose_pool.receive"):
+                return self.pool.receive()
+
+        if self.roi is None:
+            return self._process(frame), frame
+
+        # Infer on the tracked region only, then map the landmarks back into full-frame space
+        cropped = not self.roi.is_full_frame
+        landmarks = self._process(self.roi.prepare(frame))
+        if not landmarks:
+            self.roi.reset()
+            return None, frame
+        arr = self.roi.to_full(landmarks_to_array(landmarks))
+        self.roi.update(arr)
+        return (array_to_landmarks(arr) if cropped else landmarks), frame
+
+    def _process(self, image):
+        """
+        Run the in-process pose graph on an RGB image, return its landmarks or None.
+        """
+        t0 = time.perf_counter()
+        image.flags.writeable = False
+        with self.ctx.profiler.span("pose.process"):
+            results = self.pose.process(image)
+        image.flags.writeable = True
+        if self.governor:
+            self.pose = self.governor.observe(time.perf_counter() - t0, results.pose_landmarks)
+        return results.pose_landmarks
+
+    def _visualize(self, landmarks, frame):
+        """
+        Prepare the frame for display according to the GUI visualization switches.
+        :param landmarks: detected landmarks, or None
+        :param frame: frame the landmarks were detected on
+        """
+        gui = self.ctx.gui
+        if gui is None:  # headless, nothing to visualize
+            return landmarks, frame
+        calibration_mode = gui.calibration_mode
+        show_cam_capture = gui.show_cam_capture
+        show_pose_estimation = gui.show_pose_estimation
 
-        if results.pose_landmarks:
+        if landmarks:
             if not calibration_mode:
-                return results.pose_landmarks, frame
+                return landmarks, frame
 
             if not show_cam_capture:
                 frame[:] = 0  # Set black background
             if show_pose_estimation:
                 mp_drawing = mp.solutions.drawing_utils
-                mp_drawing.draw_landmarks(frame, results.pose_landmarks, self.mp_pose.POSE_CONNECTIONS)
-            return results.pose_landmarks, frame
+                mp_drawing.draw_landmarks(frame, landmarks, self.mp_pose.POSE_CONNECTIONS)
+            return landmarks, frame
         else:
             if not show_cam_capture:
                 frame[:] = 0
@@ -118,8 +321,14 @@ class Detector:
         """
         Release MediaPipe resources
         """
-        if hasattr(self, 'pose') and self.pose:
+        if getattr(self, 'governor', None):
+            self.governor.close()
+        elif hasattr(self, 'pose') and self.pose:
             self.pose.close()
+        if getattr(self, 'pool', None):
+            self.pool.close()
+        if getattr(self, 'live', None):
+            self.live.close()
 
 
 
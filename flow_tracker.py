@@ -0,0 +1,114 @@
+"""
+Group: Controller Liberators
+Optical-flow hand tracking between full pose detections.
+
+The mapper only reads the eight hand landmarks, and between two frames they can be followed far more
+cheaply with pyramidal Lucas-Kanade flow (cv2.calcOpticalFlowPyrLK) on a small grayscale image than by
+running the pose graph. The tracker is seeded with a full detection, follows the hand landmarks with flow
+on the next frames and asks for a new detection every reseed_interval frames, or as soon as the share of
+reliably tracked points (forward-backward consistent, low matching error) falls below min_confidence.
+The other landmarks keep the values of the last detection.
+"""
+
+from typing import Optional
+import numpy as np
+import cv2
+
+
+class FlowHandTracker:
+    """
+    Follow selected landmarks with sparse optical flow between pose detections.
+    """
+
+    def __init__(self, indices, reseed_interval: int = 4, max_side: int = 160, min_confidence: float = 0.75,
+                 win_size: int = 9, max_level: int = 2, max_error: float = 30.0, max_fb_error: float = 0.5):
+        self.indices = np.asarray(indices, dtype=np.intp)  # landmarks followed by flow
+        self.reseed_interval: int = max(1, reseed_interval)  # a full detection every N-th frame at least
+        self.max_side: int = max_side  # longest side of the grayscale tracking image in pixels
+        self.min_confidence: float = min_confidence  # share of reliably tracked points needed to go on
+        self.max_error: float = max_error  # LK matching error above which a point is unreliable
+        self.max_fb_error: float = max_fb_error  # forward-backward distance (tracking pixels) tolerated
+        self._lk_params = dict(winSize=(win_size, win_size), maxLevel=max_level,
+                               criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+
+        self.confidence: float = 0.0  # share of reliably tracked points on the last tracked frame
+        self.tracked_count: int = 0  # frames produced by flow
+        self.seeded_count: int = 0  # frames seeded by a detection
+        self._gray_full: Optional[np.ndarray] = None  # full size grayscale conversion buffer
+        self._gray: Optional[np.ndarray] = None  # tracking image of the current frame
+        self._prev_gray: Optional[np.ndarray] = None  # tracking image of the previous frame
+        self._size: tuple = (0, 0)  # (width, height) of the tracking images
+        self._points: Optional[np.ndarray] = None  # (N, 1, 2) float32 points in tracking image pixels
+        self._arr: Optional[np.ndarray] = None  # (33, 4) landmarks, hand rows updated by flow
+        self._since_seed: int = 0
+
+    def _to_gray(self, frame: np.ndarray) -> np.ndarray:
+        h, w = frame.shape[:2]
+        scale = min(1.0, self.max_side / max(w, h))
+        size = (max(1, round(w * scale)), max(1, round(h * scale)))
+        if size != self._size:
+            self._size = size
+            self._gray = self._prev_gray = None
+        self._gray_full = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY, dst=self._gray_full)
+        # Swap the buffers so the previous tracking image survives while the new one is written
+        self._prev_gray, self._gray = self._gray, self._prev_gray
+        self._gray = cv2.resize(self._gray_full, size, dst=self._gray, interpolation=cv2.INTER_AREA)
+        return self._gray
+
+    def should_reseed(self) -> bool:
+        """Whether the current frame needs a full detection."""
+        # The seeding frame counts, so reseed_interval - 1 tracked frames lie between two detections
+        return self._arr is None or self._since_seed >= self.reseed_interval - 1
+
+    def seed(self, frame: np.ndarray, arr: np.ndarray) -> None:
+        """
+        Restart tracking from a detection.
+        :param frame: RGB frame the landmarks were detected on
+        :param arr: (33, 4) landmark array of the detection
+        """
+        self._to_gray(frame)
+        self._arr = arr.copy()
+        w, h = self._size
+        self._points = (arr[self.indices, :2] * (w, h)).astype(np.float32).reshape(-1, 1, 2)
+        self._since_seed = 0
+        self.confidence = 1.0
+        self.seeded_count += 1
+
+    def track(self, frame: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Follow the landmarks into the frame.
+        :return: (33, 4) landmark array, or None when tracking is unreliable and a detection is needed
+        """
+        if self._arr is None:
+            return None
+        gray = self._to_gray(frame)
+        prev = self._prev_gray
+        if prev is None:  # tracking image size changed
+            self.reset()
+            return None
+        pts, status, err = cv2.calcOpticalFlowPyrLK(prev, gray, self._points, None, **self._lk_params)
+        back, back_status, _ = cv2.calcOpticalFlowPyrLK(gray, prev, pts, None, **self._lk_params)
+        fb_error = np.linalg.norm((back - self._points).reshape(-1, 2), axis=1)
+        ok = ((status.ravel() == 1) & (back_status.ravel() == 1) & (err.ravel() < self.max_error)
+              & (fb_error < self.max_fb_error))
+        self.confidence = float(ok.mean())
+        if self.confidence < self.min_confidence:
+            self.reset()
+            return None
+
+        # Unreliable points follow the mean motion of the reliable ones
+        moved = pts.reshape(-1, 2)
+        prev_pts = self._points.reshape(-1, 2)
+        if not ok.all():
+            moved[~ok] = prev_pts[~ok] + (moved[ok] - prev_pts[ok]).mean(axis=0)
+        self._points = moved.reshape(-1, 1, 2)
+        w, h = self._size
+        self._arr[self.indices, :2] = moved / (w, h)
+        self._since_seed += 1
+        self.tracked_count += 1
+        return self._arr
+
+    def reset(self) -> None:
+        """Drop the tracked state, the next frame is detected."""
+        self._arr = None
+        self._points = None
@@ -0,0 +1,104 @@
+"""
+Group: Controller Liberators
+Quality governor switching the MediaPipe model complexity at runtime.
+
+One Pose instance per complexity level is built and warmed up front, so switching is only a reference
+swap. The governor measures the inference time of the active level against a latency budget and moves
+down a level when the budget is exceeded, and up a level when the next heavier model is expected to fit.
+Low tracking confidence makes the governor climb with less headroom, since the heavier model is what
+recovers the pose. Switches are separated by a dwell period and a hysteresis band to avoid flapping.
+"""
+
+import numpy as np
+
+
+class QualityGovernor:
+    """
+    Choose the pose model complexity from measured inference latency and tracking confidence.
+    """
+
+    DEFAULT_COST_RATIO = 2.0
+    """Assumed inference cost ratio between two neighbouring levels until it has been measured"""
+
+    def __init__(self, mp_pose, pose_kwargs: dict, levels=(0, 1, 2), budget_ms: float = 25.0,
+                 hysteresis: float = 0.15, dwell_frames: int = 30, min_confidence: float = 0.6,
+                 track_indices=None, ema_alpha: float = 0.1, warmup_shape: tuple = (480, 640, 3)):
+        self.levels = sorted(levels)  # available model complexities
+        self.budget: float = budget_ms / 1000.0  # inference latency budget in seconds
+        self.hysteresis: float = hysteresis  # relative band around the budget without switching
+        self.dwell_frames: int = dwell_frames  # min frames between two switches
+        self.min_confidence: float = min_confidence  # below this the governor prefers heavier models
+        self.track_indices = track_indices  # landmarks whose visibility is the tracking confidence
+        self.ema_alpha: float = ema_alpha
+
+        # Pre-warm one graph per level so a switch never stalls a frame on graph construction
+        self.poses = {}
+        warmup = np.zeros(warmup_shape, dtype=np.uint8)
+        for level in self.levels:
+            pose = mp_pose.Pose(**dict(pose_kwargs, model_complexity=level))
+            pose.process(warmup)
+            self.poses[level] = pose
+
+        initial = pose_kwargs.get("model_complexity", self.levels[-1])
+        self.level: int = initial if initial in self.poses else self.levels[-1]  # active complexity
+        self.latency = {}  # level -> smoothed inference time in seconds
+        self.confidence: float = 1.0  # smoothed tracking confidence
+        self._cost_ratio = {}  # level -> measured latency(level + 1) / latency(level)
+        self._frames_since_switch: int = 0
+        self._left_latency = None  # (level, latency) of the level just stepped down from
+
+    @property
+    def pose(self):
+        """Pose instance of the active level."""
+        return self.poses[self.level]
+
+    def _ema(self, old, new: float) -> float:
+        return new if old is None else old + self.ema_alpha * (new - old)
+
+    def _landmark_confidence(self, landmarks) -> float:
+        if not landmarks:
+            return 0.0
+        lms = landmarks.landmark
+        indices = self.track_indices if self.track_indices is not None else range(len(lms))
+        return sum(lms[i].visibility for i in indices) / len(indices)
+
+    def observe(self, infer_time: float, landmarks):
+        """
+        Feed back one inference of the active level, return the Pose instance to use for the next frame.
+        """
+        level = self.level
+        self.latency[level] = self._ema(self.latency.get(level), infer_time)
+        self.confidence = self._ema(self.confidence, self._landmark_confidence(landmarks))
+        self._frames_since_switch += 1
+        if self._frames_since_switch < self.dwell_frames:
+            return self.pose
+
+        t = self.latency[level]
+        if self._left_latency is not None:
+            # First settled measurement after stepping down, learn the cost ratio of the two levels
+            upper, upper_t = self._left_latency
+            self._cost_ratio[level] = upper_t / max(t, 1e-6)
+            self._left_latency = None
+
+        idx = self.levels.index(level)
+        low_confidence = self.confidence < self.min_confidence
+        if idx > 0 and t > self.budget * (1.0 + self.hysteresis):
+            self._left_latency = (level, t)
+            self._switch(self.levels[idx - 1])
+        elif idx + 1 < len(self.levels):
+            expected = t * self._cost_ratio.get(level, self.DEFAULT_COST_RATIO)
+            headroom = 1.0 if low_confidence else 1.0 - self.hysteresis
+            if expected < self.budget * headroom:
+                self._switch(self.levels[idx + 1])
+        return self.pose
+
+    def _switch(self, level: int) -> None:
+        print(f"Quality governor: model complexity {self.level} -> {level} "
+              f"(latency {self.latency[self.level] * 1000.0:.1f} ms, confidence {self.confidence:.2f})")
+        self.level = level
+        self._frames_since_switch = 0
+
+    def close(self) -> None:
+        for pose in self.poses.values():
+            pose.close()
+        self.poses.clear()
@@ -14,6 +14,7 @@ from pygame.color import Color
 from context import Context
 from mapping import ControlFeature
 from presets import Preset
+from profiler import profiled
 from utils import *
 
 
@@ -25,7 +26,11 @@ class GUI:
     UI_SCALE_FACTOR = 0.6
     UI_IMG_ROOT = "UI_Icons"
 
-    def __init__(self, ctx: Context, reso: tuple, fps: float):
+    def __init__(self, ctx: Context, reso: tuple, fps: float, auto_calibration: bool = True):
+        """
+        :param auto_calibration: whether the main loop runs automatic calibrations, otherwise the key only
+            reports that they are unavailable and no button is added
+        """
         self.ctx: Context = ctx
         ctx.gui = self
         self.reso: tuple = reso
@@ -38,6 +43,8 @@ class GUI:
         self.win_resolution = self.reso
         self.screen = pygame.display.set_mode(self.win_resolution, pygame.SRCALPHA)
 
+        self._frame_surface: Optional[pygame.Surface] = None  # persistent surface showing the camera frame
+
         self.clock = pygame.time.Clock()
         self.delta_time: float = 0.0
         self.running_time: float = 0.0
@@ -53,7 +60,7 @@ class GUI:
         self._load_ui_icons()
 
         # do not close tkparam window
-        if check_os() != "Darwin":
+        if ctx.tkparam is not None:
             ctx.tkparam.root.protocol("WM_DELETE_WINDOW", fold_tkparam_win_on_close)
 
         # Load configuration parameters
@@ -71,20 +78,41 @@ class GUI:
         self.throttle_min_circle_color: Color = Color(visual_cfg.get("throttle_min_circle_color"))
         self.throttle_max_circle_color: Color = Color(visual_cfg.get("throttle_max_circle_color"))
         calibration_key = pref_cfg.get("calibration_mode_toggle_key").lower()
-        self.calibration_mode_toggle_key: int = key2pygame_mapping.get(calibration_key, pygame.K_BACKSLASH)
+        self.calibration_mode_toggle_key: int = key2pygame(calibration_key, pygame.K_BACKSLASH)
+        auto_calibration_key = pref_cfg.get("auto_calibration_key", fallback="f9").lower()
+        self.auto_calibration_key: int = key2pygame(auto_calibration_key, pygame.K_F9)
+        self.auto_calibration_requested: bool = False  # set by key or button, taken by the main loop
+        self.auto_calibration: bool = auto_calibration  # whether any loop takes the requests
+        self._prompt_font = pygame.font.Font(None, 30)  # loaded once, prompts are drawn every frame
+        self._prompt = ("", None)  # (text, rendered label) of the last prompt
 
         # Tkparam
-        if check_os() == "Darwin":
+        if ctx.tkparam is None:
             self.show_cam_capture: float = 0.0
             self.show_pose_estimation: float = 0.0
         else:
             self.switch_preset = ctx.tkparam.button("SWITCH PRESET", self._switch_preset)
             self.switch_preset = ctx.tkparam.button("SAVE CURRENT PRESET", self._save_tkparam_adjustment_to_preset)
+            if auto_calibration:
+                self.auto_calibrate = ctx.tkparam.button("AUTO CALIBRATE", self._request_auto_calibration)
             self.show_cam_capture = ctx.tkparam.button_bool("show camera capture", True)
             self.show_pose_estimation = ctx.tkparam.button_bool("show pose estimation", True)
 
         ctx.preset_mgr.register_preset_update_callback(self.__on_update_preset)
 
+    def set_viewport(self, rect: Optional[tuple] = None) -> None:
+        """
+        Restrict rendering to a region of the window, e.g. one player's tile in multi-player mode.
+        :param rect: (x, y, width, height) in window pixels, None to render to the whole window again
+        """
+        display = pygame.display.get_surface()
+        if rect is None:
+            self.screen = display
+            self.reso = self.win_resolution
+        else:
+            self.screen = display.subsurface(rect)  # shares pixels with the window, no copy
+            self.reso = (rect[2], rect[3])
+
     def _get_pos_from_per(self, per):
         return per[0] * self.reso[0], per[1] * self.reso[1]
 
@@ -96,7 +124,7 @@ class GUI:
         self.ctx.preset_mgr.apply_preset(preset_name)
 
     def _save_tkparam_adjustment_to_preset(self):
-        if check_os() == "Darwin":
+        if self.ctx.tkparam is None:
             return
         preset = self.ctx.active_preset
         dump = self.ctx.tkparam.dump_param_to_dict()
@@ -106,24 +134,26 @@ class GUI:
             preset.mapping[k] = dump[k]
         self.ctx.preset_mgr.save_active_to_file()
 
+    def _request_auto_calibration(self) -> None:
+        if not self.auto_calibration:
+            print("Automatic calibration is only available with the serial and pipeline loops")
+            return
+        self.auto_calibration_requested = True
+
     def _set_calibration_mode(self, mode: bool) -> None:
         """Set calibration mode"""
-        if check_os() == "Darwin":
+        if self.ctx.tkparam is None:
             return
         self.calibration_mode = mode
         set_window_transparency(not mode)
-        tkparam_win = self.ctx.tkparam.root
-        if mode:
-            tkparam_win.deiconify()
-        else:
-            tkparam_win.withdraw()
+        self.ctx.tkparam.set_visible(mode)  # applied by the Tk thread
         print(f"Calibration mode: {mode}")
 
     def __on_update_preset(self, preset: Preset) -> None:
         """
         Called when the active preset is updated.
         """
-        if check_os() == "Darwin":
+        if self.ctx.tkparam is None:
             self.show_cam_capture: float = preset.visual["show camera capture"]
             self.show_pose_estimation: float = preset.visual["show pose estimation"]
         else:
@@ -150,16 +180,16 @@ class GUI:
             print(f"Cannot load UI icon {path}: {e}")
             return None
 
-    def clock_tick(self) -> float:
+    @profiled()
+    def clock_tick(self, limit_fps: bool = True) -> float:
         """
         Update the clock and return the elapsed time in seconds.
+        :param limit_fps: block to cap the frame rate at fps, False when the caller paces frames itself
         """
         self.running_time = tm() - self._running_start_time
-        self.delta_time = self.clock.tick(self.fps) / 1000.0
+        self.delta_time = self.clock.tick(self.fps if limit_fps else 0) / 1000.0
         if self.show_caption_fps:
-            self.__calc_smooth_fps()
-            caption = f"{self.caption}  FPS: {self._smoothed_fps}"
-            pygame.display.set_caption(caption)
+            self.__calc_smooth_fps()  # updates the caption once per accumulation window
         return self.delta_time
 
     def __calc_smooth_fps(self) -> None:
@@ -170,7 +200,10 @@ class GUI:
         self._fps_accum_time += self.delta_time
         if self._fps_accum_count >= self._fps_accum_target:
             self._smoothed_fps = round(self._fps_accum_count / self._fps_accum_time)
-            pygame.display.set_caption(f"{self.caption}  FPS: {self._smoothed_fps}")
+            caption = f"{self.caption}  FPS: {self._smoothed_fps}"
+            if self.ctx.latency is not None and self.ctx.latency.count:
+                caption += f"  Latency: {self.ctx.latency.last_ms:.0f} ms"
+            pygame.display.set_caption(caption)
             self._fps_accum_count = 0
             self._fps_accum_time = 0.0
 
@@ -180,23 +213,29 @@ class GUI:
         """
         self.screen.fill((0, 0, 0))  # 黑色背景将完全透明
 
-    @staticmethod
-    def update_display() -> None:
+    @profiled()
+    def update_display(self) -> None:
         """
         Update the display with the rendered graphics.
         """
         pygame.display.flip()
 
+    @profiled()
     def render_np_frame(self, np_frame) -> None:
         """
         Visualize the webcam capture to the screen.
         """
         if not self.calibration_mode or (not self.show_cam_capture and not self.show_pose_estimation):
             return
-        frame = pygame.surfarray.make_surface(np_frame)
-        frame = pygame.transform.rotate(frame, -90)
-        self.screen.blit(frame, (0, 0))
-
+        h, w = np_frame.shape[:2]
+        if self._frame_surface is None or self._frame_surface.get_size() != (w, h):
+            self._frame_surface = pygame.Surface((w, h))
+        # Transposed and mirrored view written straight into the persistent surface, same image as
+        # make_surface() followed by a -90 degree rotation but without the two temporary surfaces
+        pygame.surfarray.blit_array(self._frame_surface, np_frame.swapaxes(0, 1)[::-1])
+        self.screen.blit(self._frame_surface, (0, 0))
+
+    @profiled()
     def render_pose_features(self, f: ControlFeature):
         if not self.calibration_mode:
             return
@@ -221,18 +260,19 @@ class GUI:
                 self.screen, self.fist_center_circle_color, pos_r, self.fist_center_circle_radius, 0)
             width = self.brake_throttle_circle_width
             color: Color = self.brake_min_circle_color
-            r: float = self.ctx.mapper.features.brake_radius_min * self.reso[0]
+            r: float = f.brake_radius_min * self.reso[0]
             pygame.draw.circle(self.screen, color, fist_center, r, width)
             color: Color = self.brake_max_circle_color
-            r = self.ctx.mapper.features.brake_radius_max * self.reso[0]
+            r = f.brake_radius_max * self.reso[0]
             pygame.draw.circle(self.screen, color, fist_center, r, width)
             color: Color = self.throttle_min_circle_color
-            r = self.ctx.mapper.features.throttle_radius_min * self.reso[0]
+            r = f.throttle_radius_min * self.reso[0]
             pygame.draw.circle(self.screen, color, fist_center, r, width)
             color: Color = self.throttle_max_circle_color
-            r = self.ctx.mapper.features.throttle_radius_max * self.reso[0]
+            r = f.throttle_radius_max * self.reso[0]
             pygame.draw.circle(self.screen, color, fist_center, r, width)
 
+    @profiled()
     def render_game_controls(self, feat: ControlFeature) -> None:
         self.__render_game_controls(feat.brake_pressure, feat.throttle_pressure, feat.handbrake_active,
                                     feat.left_pressure, feat.right_pressure)
@@ -249,8 +289,8 @@ class GUI:
         :param right_pressure: 0.0-1.0, right turn pressure (D key)
         """
         # 基础位置（右下角）
-        base_x = self.win_resolution[0] - 200
-        base_y = self.win_resolution[1] - 280
+        base_x = self.reso[0] - 200
+        base_y = self.reso[1] - 280
 
         # 1. 绘制按钮组（Y, X, B, A）在下方
         button_x = base_x + 60
@@ -273,6 +313,17 @@ class GUI:
         wheel_y = button_y - 30  # 与按键Y平齐，再往上移30
         self.__draw_wheel(wheel_x, wheel_y, left_pressure, right_pressure)
 
+    def render_prompt(self, text: str) -> None:
+        """
+        Draw an instruction line at the top of the window, e.g. the current automatic calibration pose.
+        """
+        if self._prompt[0] != text or self._prompt[1] is None:
+            self._prompt = (text, self._prompt_font.render(text, True, (255, 255, 255)))
+        label = self._prompt[1]
+        rect = label.get_rect(midtop=(self.reso[0] // 2, 12))
+        pygame.draw.rect(self.screen, (0, 0, 0), rect.inflate(16, 8), border_radius=6)
+        self.screen.blit(label, rect)
+
     def __draw_pedal(self, x, y, pressure, color, label):
         """
         Draw a pedal using icon image with fill based on pressure.
@@ -452,6 +503,7 @@ class GUI:
             surface_pos = (btn['pos'][0] - btn_size // 2, btn['pos'][1] - btn_size // 2)
             self.screen.blit(btn_surface, surface_pos)
 
+    @profiled()
     def handle_events(self) -> bool:
         for e in pygame.event.get():
             if e.type == pygame.QUIT:
@@ -461,6 +513,8 @@ class GUI:
             if e.type == pygame.KEYDOWN:
                 if e.key == self.calibration_mode_toggle_key:
                     self._set_calibration_mode(not self.calibration_mode)
+                elif e.key == self.auto_calibration_key:
+                    self._request_auto_calibration()
         return True
 
     @staticmethod
@@ -0,0 +1,90 @@
+"""
+Group: Controller Liberators
+Landmark helpers shared by the detector stages.
+
+MediaPipe hands out landmarks as NormalizedLandmarkList protobufs. For arithmetic on the landmarks
+(interpolation, coordinate remapping, recording) they are converted into a (33, 4) float32 array of
+(x, y, z, visibility) rows, and converted back when a protobuf is needed for drawing or mapping.
+"""
+
+from collections import deque
+import numpy as np
+
+NUM_LANDMARKS = 33
+"""Number of pose landmarks produced by MediaPipe Pose"""
+
+
+def landmarks_to_array(landmarks, out: np.ndarray = None) -> np.ndarray:
+    """
+    Convert a NormalizedLandmarkList into a (33, 4) float32 array of (x, y, z, visibility).
+    :param landmarks: landmarks detected by MediaPipe
+    :param out: optional preallocated (33, 4) float32 array to write into
+    """
+    if out is None:
+        out = np.empty((NUM_LANDMARKS, 4), dtype=np.float32)
+    for i, lm in enumerate(landmarks.landmark):
+        out[i, 0] = lm.x
+        out[i, 1] = lm.y
+        out[i, 2] = lm.z
+        out[i, 3] = lm.visibility
+    return out
+
+
+def array_to_landmarks(arr: np.ndarray):
+    """
+    Convert a (33, 4) array of (x, y, z, visibility) back into a NormalizedLandmarkList.
+    """
+    from mediapipe.framework.formats import landmark_pb2  # imported on first use, not with this module
+    landmark_list = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z, v in arr.tolist():
+        landmark_list.landmark.add(x=x, y=y, z=z, visibility=v)
+    return landmark_list
+
+
+class LandmarkHistory:
+    """
+    Recent detections with timestamps, used to estimate landmarks at times without a detection.
+    """
+
+    def __init__(self, size: int = 2, max_horizon: float = 0.25):
+        self._items = deque(maxlen=max(2, size))  # (timestamp, (33, 4) array)
+        self.max_horizon: float = max_horizon  # seconds beyond the newest detection to extrapolate at most
+
+    def __len__(self):
+        return len(self._items)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    def add(self, t: float, arr: np.ndarray) -> None:
+        self._items.append((t, arr.copy()))
+
+    def velocity(self, indices=None) -> float:
+        """
+        Mean speed (normalized image units per second) of the given landmarks between the last two detections.
+        """
+        if len(self._items) < 2:
+            return 0.0
+        (t0, a0), (t1, a1) = self._items[-2], self._items[-1]
+        if t1 <= t0:
+            return 0.0
+        d = a1[:, :2] - a0[:, :2] if indices is None else a1[indices, :2] - a0[indices, :2]
+        return float(np.linalg.norm(d, axis=1).mean() / (t1 - t0))
+
+    def estimate(self, t: float):
+        """
+        Estimate landmarks at time t by linear extrapolation from the last two detections.
+        Returns a (33, 4) array, or None if there is no detection yet.
+        """
+        if not self._items:
+            return None
+        t1, a1 = self._items[-1]
+        if len(self._items) < 2:
+            return a1.copy()
+        t0, a0 = self._items[-2]
+        if t1 <= t0:
+            return a1.copy()
+        k = min(t - t1, self.max_horizon) / (t1 - t0)
+        est = a1 + (a1 - a0) * k
+        est[:, 3] = a1[:, 3]  # keep the visibility of the newest detection
+        return est
@@ -0,0 +1,101 @@
+"""
+Group: Controller Liberators
+Glass-to-control latency tracing.
+
+Every captured frame gets a FrameStamp holding its sequence number and monotonic capture time. The stamp
+travels with the frame through detection, feature extraction and control output, each stage adds its
+completion time, and once the controls are emitted the stamp is recorded by the LatencyTracker. The tracker
+keeps the whole session in a preallocated ring buffer and reports the latency distribution.
+"""
+
+import time
+import numpy as np
+
+
+class FrameStamp:
+    """
+    Sequence number and per-stage timestamps (time.perf_counter seconds) of one frame.
+    """
+    __slots__ = ("seq", "t_capture", "t_detected", "t_mapped", "t_emitted")
+
+    def __init__(self, seq: int, t_capture: float):
+        self.seq: int = seq  # capture sequence number
+        self.t_capture: float = t_capture  # when the frame was captured
+        self.t_detected: float = 0.0  # when landmarks for the frame were available
+        self.t_mapped: float = 0.0  # when control features were extracted
+        self.t_emitted: float = 0.0  # when controls were sent to the virtual controller
+
+    def __repr__(self):
+        return f"FrameStamp(seq={self.seq}, t_capture={self.t_capture:.4f})"
+
+
+class LatencyTracker:
+    """
+    Session-long record of capture-to-actuation latencies.
+    """
+
+    COLUMNS = ("seq", "t_capture", "detect_ms", "map_ms", "emit_ms", "total_ms")
+
+    def __init__(self, capacity: int = 216000):
+        self.capacity: int = capacity  # records kept, 216000 = two hours at 30 fps
+        self._rows = np.zeros((capacity, len(self.COLUMNS)), dtype=np.float64)
+        self.count: int = 0  # records ever added
+        self.last_ms: float = 0.0  # total latency of the newest record
+
+    def record(self, stamp: FrameStamp) -> None:
+        """
+        Record a stamp whose controls have just been emitted.
+        """
+        if stamp is None:
+            return
+        if not stamp.t_emitted:
+            stamp.t_emitted = time.perf_counter()
+        t_detected = stamp.t_detected or stamp.t_capture
+        t_mapped = stamp.t_mapped or t_detected
+        row = self._rows[self.count % self.capacity]
+        row[0] = stamp.seq
+        row[1] = stamp.t_capture
+        row[2] = (t_detected - stamp.t_capture) * 1000.0
+        row[3] = (t_mapped - t_detected) * 1000.0
+        row[4] = (stamp.t_emitted - t_mapped) * 1000.0
+        row[5] = (stamp.t_emitted - stamp.t_capture) * 1000.0
+        self.last_ms = row[5]
+        self.count += 1
+
+    @property
+    def rows(self) -> np.ndarray:
+        """Recorded rows in chronological order."""
+        if self.count <= self.capacity:
+            return self._rows[:self.count]
+        split = self.count % self.capacity
+        return np.concatenate((self._rows[split:], self._rows[:split]))
+
+    def summary(self) -> dict:
+        """
+        Latency distribution per segment: {column: {mean, p50, p95, p99, max}} in milliseconds.
+        """
+        rows = self.rows
+        if len(rows) == 0:
+            return {}
+        ret = {}
+        for i, name in enumerate(self.COLUMNS[2:], start=2):
+            values = rows[:, i]
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            ret[name] = {"mean": float(values.mean()), "p50": float(p50), "p95": float(p95),
+                         "p99": float(p99), "max": float(values.max())}
+        return ret
+
+    def report(self) -> None:
+        summary = self.summary()
+        if not summary:
+            print("Latency: no frame reached the controller")
+            return
+        print(f"Capture-to-control latency over {min(self.count, self.capacity)} frames (ms):")
+        for name, s in summary.items():
+            print(f"  {name:<10} mean {s['mean']:7.2f}  p50 {s['p50']:7.2f}  p95 {s['p95']:7.2f}  "
+                  f"p99 {s['p99']:7.2f}  max {s['max']:7.2f}")
+
+    def save_csv(self, path: str) -> None:
+        np.savetxt(path, self.rows, delimiter=",", header=",".join(self.COLUMNS), comments="",
+                   fmt=["%d", "%.6f", "%.3f", "%.3f", "%.3f", "%.3f"])
+        print(f"Latency trace written to {path}")
@@ -4,73 +4,323 @@ Main entrance of the program. The code initializes components and maintain the m
 The loop handles the process flow from image capturing to landmark detection to pose-control mapping.
 """
 
-from utils import check_os
-if check_os() == "Windows":
-    from control.gamepad import VGamepadWin
-    gamepad = VGamepadWin(skip=False)
-else:
-    from control.keyboard import KeyboardController
-    gamepad = KeyboardController()
-
-import cv2
+import time
+import asyncio
 import configparser
+from utils import check_os
 from context import Context
+from startup import Startup
+from capture_profiles import parse_profiles, probe_profiles
+from recording import LandmarkRecorder
+from calibration import AutoCalibration
+from landmarks import landmarks_to_array
+from latency import FrameStamp, LatencyTracker
+from players import PlayerManager
 from presets import PresetManager
-from detector import Detector
 from mapping import PoseControlMapper
-from gui import GUI
-
-# Load configuration
-config = configparser.ConfigParser()
-config.read('sysconfig.ini')
-os_name = check_os()
-print(f"Current OS: {os_name}")
-
-# Initialize components
-ctx = Context(config)
-preset_mgr = PresetManager(ctx)
-camera = cv2.VideoCapture(0)
-CAP_SETTING = [(640, 480), 30]  # [resolution, fps]
-# RESO = [(1280, 720), 30]
-camera.set(cv2.CAP_PROP_FRAME_WIDTH, CAP_SETTING[0][0])
-camera.set(cv2.CAP_PROP_FRAME_HEIGHT, CAP_SETTING[0][1])
-gui = GUI(ctx, CAP_SETTING[0], CAP_SETTING[1])
-detector = Detector(ctx)
-mapper = PoseControlMapper(ctx)
-ctx.gamepad = gamepad
-preset_mgr.load_presets()
-
-# Main loop
-while True:
-    if not gui.handle_events():
-        print("Quit application")
-        break
-
-    gui.clock_tick()
-    gui.clear_color()
-
-    ret, frame = camera.read()
-    if not ret:
-        print("Cannot capture frame")
-        break
-
-    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)  # Turn BGR image format to RGB
-    landmarks, frame = detector.get_landmarks(frame)  # Detect pose landmarks
-
-    if landmarks:
-        gui.render_np_frame(frame)  # Draw webcam capture
-        feats = mapper.extract_features(landmarks)  # Extract pose features
-        gui.render_pose_features(feats)  # Draw pose features on GUI
-        gui.render_game_controls(feats)  # Draw game controls based on extracted features
-        mapper.trigger_control()  # Map pose features to gamepad controls
-    else:
-        gui.render_np_frame(frame)
-
-    gui.update_display()  # Update GUI display
-
-# Release resources
-camera.release()
-gamepad.close()
-detector.close()
-ctx.close()
-gui.quit()
+# cv2, mediapipe, pygame and the controller backends are imported where they are needed, mostly on startup threads
+
+
+def main():
+    startup = Startup()
+
+    # Load configuration
+    config = configparser.ConfigParser()
+    config.read('sysconfig.ini')
+    os_name = check_os()
+    print(f"Current OS: {os_name}")
+
+    if config.getboolean("Players", "enabled", fallback=False):
+        run_players(config, 'sysconfig.ini')
+        return
+
+    # Independent components start concurrently, pygame stays on the main thread
+    ctx = Context(config, defer_tkparam=True)
+    preset_mgr = PresetManager(ctx)
+    cap_cfg = config["Capture"]
+    profile = parse_profiles(cap_cfg.get("profiles", fallback="640x480@30"))[0]
+    camera_task = startup.submit("camera", open_camera, config)
+    frame_shape = (profile.resolution[1], profile.resolution[0], 3)
+    detector_task = startup.submit("pose graph", create_detector, ctx, frame_shape)
+    tkparam_task = startup.submit("calibration window", ctx.open_tkparam)
+    gamepad_task = startup.submit("controller", create_gamepad, os_name)
+
+    if cap_cfg.getboolean("probe", fallback=False):
+        camera, profile = camera_task.result()  # the window size depends on the probed profile
+    runtime_loop = config.get("Runtime", "loop", fallback="serial")
+    from gui import GUI
+    tkparam_task.result()  # GUI and mapper register their parameters in the calibration window
+    gui = GUI(ctx, profile.resolution, profile.fps, auto_calibration=runtime_loop != "asyncio")
+    startup.mark("window")
+    mapper = PoseControlMapper(ctx)
+    ctx.gamepad = gamepad = gamepad_task.result()
+    if config.getboolean("Latency", "trace", fallback=True):
+        ctx.latency = LatencyTracker()
+    preset_mgr.load_presets()
+    camera, _ = camera_task.result()
+
+    # Show the camera feed while the pose graph is still loading
+    detector = show_camera_until_ready(gui, camera, detector_task, startup)
+    if detector is None:
+        release(ctx, camera, gamepad, detector_task.result(), gui, None)
+        return
+    startup.mark("detector ready")
+
+    # Optionally record every detection for offline replay
+    recorder = None
+    record_path = config.get("Recording", "landmarks_file", fallback="").strip()
+    if record_path:
+        recorder = LandmarkRecorder(record_path)
+
+    if runtime_loop == "asyncio":
+        from async_runtime import AsyncRuntime
+        runtime = AsyncRuntime(ctx, camera, detector, mapper, gui, recorder=recorder, startup=startup,
+                               control_hz=config.getfloat("Runtime", "control_hz", fallback=60.0))
+        asyncio.run(runtime.run())
+        startup.shutdown()  # also when no control was emitted
+        release(ctx, camera, gamepad, detector, gui, recorder)
+        return
+
+    # Pipelined mode overlaps capture and detection with rendering and control
+    pipeline = None
+    if runtime_loop == "pipeline":
+        from pipeline import Pipeline
+        pipeline = Pipeline(camera, detector,
+                            queue_size=config.getint("Runtime", "queue_size", fallback=1),
+                            stats_interval=config.getfloat("Runtime", "stats_interval", fallback=5.0)).start()
+
+    # Main loop
+    import cv2
+    rgb_frame = None  # RGB conversion buffer reused across iterations
+    landmark_arr = None  # landmark array shared by recorder and calibration, reused across iterations
+    prof = ctx.profiler
+    calibration = None  # running automatic calibration
+    while True:
+        if not gui.handle_events():
+            print("Quit application")
+            break
+
+        gui.clock_tick()
+        gui.clear_color()
+
+        if pipeline:
+            ret, landmarks, frame, stamp, fresh = pipeline.get()  # Newest detection result from the detect stage
+            if not ret:
+                print("Cannot capture frame")
+                break
+            t_render = time.perf_counter()
+        else:
+            with prof.span("capture"):
+                ret, frame = camera.read()
+            if not ret:
+                print("Cannot capture frame")
+                break
+
+            stamp = FrameStamp(camera.frame_seq, camera.frame_timestamp)
+            with prof.span("cvtColor"):
+                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb_frame)  # Turn BGR image format to RGB
+            landmarks, frame = detector.get_landmarks(rgb_frame, stamp)  # Detect pose landmarks
+            stamp, fresh = detector.last_stamp, detector.fresh
+
+        if gui.auto_calibration_requested:
+            gui.auto_calibration_requested = False
+            calibration = start_calibration(config)
+
+        if landmarks:
+            if (recorder or calibration) and fresh and stamp is not None:  # both need the capture time
+                landmark_arr = landmarks_to_array(landmarks, out=landmark_arr)  # converted once for both
+                if recorder:
+                    recorder.write(stamp.t_capture, stamp.seq, landmark_arr)
+                if calibration and calibration.feed(stamp.t_capture, landmark_arr):
+                    finish_calibration(calibration, preset_mgr, config)
+                    calibration = None
+            gui.render_np_frame(frame)  # Draw webcam capture
+            feats = mapper.features  # a repeated result stays on screen, it is not mapped or emitted again
+            if fresh:
+                feats = mapper.extract_features(landmarks, stamp)  # Extract pose features
+            gui.render_pose_features(feats)  # Draw pose features on GUI
+            gui.render_game_controls(feats)  # Draw game controls based on extracted features
+            if fresh:
+                if calibration:
+                    mapper.neutral_control()  # calibration poses must not drive the car
+                else:
+                    mapper.trigger_control()  # Map pose features to gamepad controls
+                if "first control" not in startup.milestones:
+                    startup.mark("first control")  # time-to-first-control
+                    startup.report()
+                    startup.shutdown()
+        else:
+            gui.render_np_frame(frame)
+        if calibration:
+            gui.render_prompt(calibration.prompt)
+
+        gui.update_display()  # Update GUI display
+        if pipeline:
+            pipeline.release(frame)
+            pipeline.add_render_time(time.perf_counter() - t_render)
+        else:
+            detector.release_frame(frame)  # process pool frames are views into its shared memory
+
+    # Release resources
+    if pipeline:
+        pipeline.stop()
+    release(ctx, camera, gamepad, detector, gui, recorder)
+
+
+def open_camera(config):
+    """
+    Open the configured frame source, probing the capture profiles first when enabled.
+    :return: (camera, capture profile)
+    """
+    from sources import open_source
+    from capture import ThreadedCapture
+    cap_cfg = config["Capture"]
+    source_spec = cap_cfg.get("source", fallback="camera:0")
+    buffer_size = cap_cfg.getint("buffer_size", fallback=1)
+    profiles = parse_profiles(cap_cfg.get("profiles", fallback="640x480@30"))
+    profile = profiles[0]  # first configured profile unless probing finds a better one
+    if cap_cfg.getboolean("probe", fallback=False) and source_spec.strip().startswith("camera"):
+        probed = probe_profiles(int(source_spec.partition(":")[2] or 0), profiles,
+                                cap_cfg.getfloat("target_fps", fallback=30.0), buffer_size,
+                                cap_cfg.getint("probe_frames", fallback=30))
+        if probed is None:
+            print(f"No capture profile meets the target frame rate, using {profile}")
+        profile = probed or profile
+    camera = open_source(source_spec, profile.resolution, profile.fps,
+                         realtime=cap_cfg.getboolean("realtime", fallback=True),
+                         loop=cap_cfg.getboolean("loop", fallback=False),
+                         fourcc=profile.fourcc, buffer_size=buffer_size)
+    # Always hand the freshest frame to the detector; offline sources deliver every frame, so runs repeat exactly
+    if cap_cfg.getboolean("threaded_capture", fallback=True) and camera.live:
+        camera = ThreadedCapture(camera).start()
+    return camera, profile
+
+
+def create_detector(ctx, frame_shape: tuple):
+    """
+    Build the pose detector and warm its graph up on a black frame.
+    """
+    from detector import Detector
+    detector = Detector(ctx)
+    detector.warm_up(frame_shape)
+    return detector
+
+
+def create_gamepad(os_name: str):
+    if os_name == "Windows":
+        from control.gamepad import VGamepadWin
+        return VGamepadWin(skip=False)
+    from control.keyboard import KeyboardController
+    return KeyboardController()
+
+
+def show_camera_until_ready(gui, camera, detector_task, startup):
+    """
+    Show the camera feed until the pose detector has been built.
+    :return: the detector, or None when the window was closed or the camera stopped before
+    """
+    import cv2
+    rgb_frame = None
+    if not detector_task.done():
+        print("Pose model warming up, showing the camera feed meanwhile")
+    while not detector_task.done():
+        if not gui.handle_events():
+            print("Quit application")
+            return None
+        gui.clock_tick()
+        gui.clear_color()
+        ret, frame = camera.read()
+        if not ret:
+            print("Cannot capture frame")
+            return None
+        startup.mark("first frame")
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb_frame)
+        gui.render_np_frame(rgb_frame)
+        gui.update_display()
+    return detector_task.result()
+
+
+def start_calibration(config) -> AutoCalibration:
+    cal_cfg = config["Calibration"]
+    print("Automatic calibration started")
+    return AutoCalibration(settle=cal_cfg.getfloat("settle_seconds", fallback=1.5),
+                           hold=cal_cfg.getfloat("hold_seconds", fallback=3.0),
+                           coverage=cal_cfg.getfloat("coverage", fallback=0.9))
+
+
+def finish_calibration(calibration: AutoCalibration, preset_mgr: PresetManager, config) -> None:
+    """
+    Fit the thresholds of a finished calibration, then save and apply them as a preset.
+    """
+    name = config.get("Calibration", "preset_name", fallback="calibrated")
+    try:
+        preset = calibration.fit_preset(preset_mgr.active_preset or preset_mgr.get_preset("default"), name)
+    except ValueError as e:
+        print(f"Calibration failed: {e}")
+        return
+    print(f"Calibrated thresholds: {preset.mapping}")
+    preset_mgr.register_preset(name, preset)
+    preset_mgr.apply_preset(name)
+    preset_mgr.save_active_to_new_file(name)
+
+
+def run_players(config, config_path: str) -> None:
+    """
+    Multi-player mode: every player pipeline runs in its own process, this process only shows the overlay.
+    """
+    from gui import GUI
+    ctx = Context(config, headless=True)  # per-player calibration comes from their presets
+    preset_mgr = PresetManager(ctx)
+    players = PlayerManager(config, config_path)
+    gui = GUI(ctx, players.window_resolution, config.getfloat("Players", "overlay_fps", fallback=30.0),
+              auto_calibration=False)  # players calibrate through their presets
+    preset_mgr.load_presets()
+    players.start()
+
+    while players.alive:
+        if not gui.handle_events():
+            print("Quit application")
+            break
+        gui.clock_tick()
+        gui.clear_color()
+        players.poll()  # newest snapshot of every player
+        players.render(gui)
+        gui.update_display()
+
+    players.stop()
+    ctx.close()
+    gui.quit()
+
+
+def release(ctx, camera, gamepad, detector, gui, recorder) -> None:
+    """
+    Report the session statistics and release resources.
+    """
+    config = ctx.cfg
+    prof = ctx.profiler
+    if recorder:
+        recorder.close()
+    if prof.enabled:
+        print("Profile summary:")
+        prof.report()
+        trace_file = config.get("Profiling", "chrome_trace_file", fallback="").strip()
+        if trace_file:
+            prof.export_chrome_trace(trace_file)
+        csv_file = config.get("Profiling", "csv_file", fallback="").strip()
+        if csv_file:
+            prof.export_csv(csv_file)
+    if ctx.latency:
+        ctx.latency.report()
+        latency_csv = config.get("Latency", "csv_file", fallback="").strip()
+        if latency_csv:
+            ctx.latency.save_csv(latency_csv)
+    camera.release()
+    gamepad.close()
+    detector.close()
+    ctx.close()
+    gui.quit()
+
+
+# Guarded so that spawned inference worker processes can import this module without starting the app
+if __name__ == "__main__":
+    main()
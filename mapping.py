@@ -4,23 +4,58 @@ This program processes the pose data and maps it to control signals and send the
 """
 
 import math
-from typing import List
+import time
+from typing import NamedTuple, Optional
+import numpy as np
 from context import Context
+from landmarks import NUM_LANDMARKS
+from latency import FrameStamp
+from profiler import profiled
 from presets import Preset
+from control_filter import HandFilter
+from response_curves import ResponseCurves
 from utils import *
 
 
+PRESET_MAPPING_KEYS = ("steering safe angle", "steering left border", "steering right border",
+                       "brake radius min", "brake radius max", "throttle radius min", "throttle radius max")
+"""Preset mapping keys of the MappingParams fields, in field order"""
+
+
+class MappingParams(NamedTuple):
+    """
+    Immutable snapshot of the mapping parameters as plain floats, in PRESET_MAPPING_KEYS order.
+    """
+    steering_safe_angle: float = 0.0
+    steering_left_border_angle: float = 0.0
+    steering_right_border_angle: float = 0.0
+    brake_radius_min: float = 0.0
+    brake_radius_max: float = 0.0
+    throttle_radius_min: float = 0.0
+    throttle_radius_max: float = 0.0
+
+    @classmethod
+    def from_mapping(cls, mapping: dict) -> "MappingParams":
+        """Snapshot of a preset mapping dict."""
+        return cls(*(float(mapping[k]) for k in PRESET_MAPPING_KEYS))
+
+
 class ControlFeature:
     """
     Containing process landmark features and game control parameters.
+    Slotted and updated in place every frame, the hand centers are fixed arrays written element-wise.
     """
+    __slots__ = ("ctx", "hand_left_center", "hand_right_center", "hands_center", "steer_angle", "fist_diameter",
+                 "left_pressure", "right_pressure", "brake_pressure", "throttle_pressure", "handbrake_active",
+                 "stamp", "params", "_store", "_params_version")
+
     def __init__(self, ctx: Context):
         self.ctx = ctx
 
         # Visualizing parameters
-        self.hand_left_center: List = [0.0, 0.0]  # [0,1] uniformed hands center in pygame coordinate
-        self.hand_right_center: List = [0.0, 0.0]  # [0,1] uniformed hands center in pygame coordinate
-        self.hands_center: List = [0.0, 0.0]  # [0,1] uniformed hands center in pygame coordinate
+        self.hand_left_center: np.ndarray = np.zeros(2)  # [0,1] uniformed hands center in pygame coordinate
+        self.hand_right_center: np.ndarray = np.zeros(2)  # [0,1] uniformed hands center in pygame coordinate
+        self.hands_center: np.ndarray = np.zeros(2)  # [0,1] uniformed hands center in pygame coordinate
         self.steer_angle: float = 0.0  # [-180,180] estimated steering angle in degrees
         self.fist_diameter: float = 0.0  # diameter of a circle made by two fists
 
@@ -29,35 +64,52 @@ class ControlFeature:
         self.brake_pressure: float = 0.0  # [0,1] brake trigger strength
         self.throttle_pressure: float = 0.0  # [0,1] throttle trigger strength
         self.handbrake_active: bool = False  # whether handbrake is active
+        self.stamp: Optional[FrameStamp] = None  # stamp of the frame the features were extracted from
 
-        if check_os() == "Darwin":
-            self.steering_safe_angle: float = 0.0
-            self.steering_left_border_angle: float = 0.0
-            self.steering_right_border_angle: float = 0.0
-            # self.throttle_dist_ratio_center: float = 0.0
-            # self.throttle_dist_ratio_safe_dist: float = 0.0
-            # self.throttle_dist_ratio_max_dist: float = 0.0
-            self.brake_radius_min: float = 0.0
-            self.brake_radius_max: float = 0.0
-            self.throttle_radius_min: float = 0.0
-            self.throttle_radius_max: float = 0.0
-        else:
-            # Control parameters
+        # Mapping parameters of the current frame, the hot path reads only this snapshot
+        self.params: MappingParams = MappingParams()
+        self._store = ctx.params  # published parameters, from presets and the calibration window
+        self._params_version: int = -1  # store version the snapshot was built from
+
+        if ctx.tkparam is not None:
+            # Control parameters, the sliders publish their values to the parameter store
             # Steering sensitivity
-            self.steering_safe_angle = ctx.tkparam.scalar("steering safe angle", 7.0, 0.0, 30.0)
-            self.steering_left_border_angle = ctx.tkparam.scalar("steering left border", 45.0, 0.0, 80.0)
-            self.steering_right_border_angle = ctx.tkparam.scalar("steering right border", 45.001, 0.0, 80.0)
+            ctx.tkparam.scalar("steering safe angle", 7.0, 0.0, 30.0)
+            ctx.tkparam.scalar("steering left border", 45.0, 0.0, 80.0)
+            ctx.tkparam.scalar("steering right border", 45.001, 0.0, 80.0)
 
             # throttle and brake
             # -max_dist ---- -safe_dist --- 0 --- safe_dist --- max_dist
             # |<-     brake     ->|                 |<-  throttle  ->|
-            # self.throttle_dist_ratio_center = ctx.tkparam.scalar("throttle measure center", 6.0, 0.0, 9.0)
-            # self.throttle_dist_ratio_safe_dist = ctx.tkparam.scalar("throttle safe distance", 0.6, 0.0, 2.0)
-            # self.throttle_dist_ratio_max_dist = ctx.tkparam.scalar("throttle max distance", 2.0, 0.0, 5.0)
-            self.brake_radius_min = ctx.tkparam.scalar("brake radius min", 6.0, 0.0, 1.0)
-            self.brake_radius_max = ctx.tkparam.scalar("brake radius max", 6.001, 0.0, 1.0)
-            self.throttle_radius_min = ctx.tkparam.scalar("throttle radius min", 6.002, 0.0, 1.0)
-            self.throttle_radius_max = ctx.tkparam.scalar("throttle radius max", 6.003, 0.0, 1.0)
+            # ctx.tkparam.scalar("throttle measure center", 6.0, 0.0, 9.0)
+            # ctx.tkparam.scalar("throttle safe distance", 0.6, 0.0, 2.0)
+            # ctx.tkparam.scalar("throttle max distance", 2.0, 0.0, 5.0)
+            ctx.tkparam.scalar("brake radius min", 6.0, 0.0, 1.0)
+            ctx.tkparam.scalar("brake radius max", 6.001, 0.0, 1.0)
+            ctx.tkparam.scalar("throttle radius min", 6.002, 0.0, 1.0)
+            ctx.tkparam.scalar("throttle radius max", 6.003, 0.0, 1.0)
+
+    def refresh_params(self) -> MappingParams:
+        """
+        Pick up the current parameter store snapshot, once per frame. Unless a parameter was published since
+        the last call, this is one reference read and a version comparison.
+        """
+        snapshot = self._store.snapshot
+        if snapshot.version != self._params_version:
+            self._params_version = snapshot.version
+            values = snapshot.values
+            if all(k in values for k in PRESET_MAPPING_KEYS):  # keep the last snapshot until all are published
+                self.params = MappingParams.from_mapping(values)
+        return self.params
+
+    # Read-only views of the snapshot for the overlay
+    steering_safe_angle = property(lambda self: self.params.steering_safe_angle)
+    steering_left_border_angle = property(lambda self: self.params.steering_left_border_angle)
+    steering_right_border_angle = property(lambda self: self.params.steering_right_border_angle)
+    brake_radius_min = property(lambda self: self.params.brake_radius_min)
+    brake_radius_max = property(lambda self: self.params.brake_radius_max)
+    throttle_radius_min = property(lambda self: self.params.throttle_radius_min)
+    throttle_radius_max = property(lambda self: self.params.throttle_radius_max)
 
 
 class PoseControlMapper:
@@ -81,6 +133,9 @@ class PoseControlMapper:
         self.ctx: Context = ctx
         ctx.mapper = self
         self.features = ControlFeature(ctx)
+        self._centers = np.empty((2, 2))  # (left, right) hand center (x, y) reused every frame
+        self.filter = HandFilter()  # jitter filter and latency predictor of the hand centers
+        self.curves = ResponseCurves()  # response curves of the active preset, compiled to lookup tables
 
         # previous button states, trigger press/release only on state changes
         self._prev_menu_pressed = False
@@ -89,56 +144,63 @@ class PoseControlMapper:
         ctx.preset_mgr.register_preset_update_callback(self.__on_update_preset)
 
     def __on_update_preset(self, preset: Preset) -> None:
-        if check_os() == "Darwin":
-            f = self.features
-            f.steering_safe_angle = preset.mapping["steering safe angle"]
-            f.steering_left_border_angle = preset.mapping["steering left border"]
-            f.steering_right_border_angle = preset.mapping["steering right border"]
-            # f.throttle_dist_ratio_center = preset.mapping["throttle measure center"]
-            # f.throttle_dist_ratio_safe_dist = preset.mapping["throttle safe distance"]
-            # f.throttle_dist_ratio_max_dist = preset.mapping["throttle max distance"]
-            f.brake_radius_min = preset.mapping["brake radius min"]
-            f.brake_radius_max = preset.mapping["brake radius max"]
-            f.throttle_radius_min = preset.mapping["throttle radius min"]
-            f.throttle_radius_max = preset.mapping["throttle radius max"]
-        else:
-            self.ctx.tkparam.load_param_from_dict(preset.mapping)
+        self.filter.configure(preset.filter)
+        self.curves = ResponseCurves(preset.curves)
+        # The calibration window picks the values up from the store on its own thread
+        self.ctx.params.publish(preset.mapping)
 
-    def extract_features(self, landmarks) -> ControlFeature:
+    @profiled()
+    def extract_features(self, landmarks, stamp: FrameStamp = None, timestamp: float = None) -> ControlFeature:
         """
         Update extracted features from the given landmarks, and store them in the PoseFeature instance
+        :param landmarks: NormalizedLandmarkList, or a (33, 4) landmark array
+        :param stamp: optional FrameStamp of the frame the landmarks were detected on, traced to the controller
+        :param timestamp: capture time of the landmarks in seconds for the jitter filter, defaults to the stamp's
+            capture time; offline callers without stamps (e.g. replays) must pass the recorded timestamps
         """
 
         f = self.features
         if landmarks is None:
             return f
+        f.stamp = stamp
 
-        # Get center of hands
-        left_points = [L(landmarks, i) for i in self.left_hand_indices]
-        right_points = [L(landmarks, i) for i in self.right_hand_indices]
+        if isinstance(landmarks, np.ndarray):
+            # Both hand centers come out of a single product with the averaging weights
+            (lcx, lcy), (rcx, rcy) = np.matmul(HAND_WEIGHTS, landmarks[:, :2], out=self._centers).tolist()
+        else:
+            # Of a protobuf only the 8 hand landmarks are read, converting all 33 would cost more than the mapping
+            lm = landmarks.landmark
+            lcx, lcy = _mean_xy(lm, self.left_hand_indices)
+            rcx, rcy = _mean_xy(lm, self.right_hand_indices)
+        if self.filter.enabled:
+            now = time.perf_counter()
+            if timestamp is None:
+                timestamp = stamp.t_capture if stamp is not None else now
+            # Only live frames have a pipeline latency to predict over, recorded ones are mapped at their own time
+            latency = now - stamp.t_capture if stamp is not None else 0.0
+            lcx, lcy, rcx, rcy = self.filter.process(timestamp, latency, (lcx, lcy, rcx, rcy)).tolist()
+        f.hand_left_center[0], f.hand_left_center[1] = 1-lcx, lcy
+        f.hand_right_center[0], f.hand_right_center[1] = 1-rcx, rcy
+        f.hands_center[0], f.hands_center[1] = 1-(lcx+rcx)/2.0, (lcy+rcy)/2.0
 
-        lcx, lcy, lcz = avg(left_points)
-        rcx, rcy, rcz = avg(right_points)
-        f.hand_left_center = [1-lcx, lcy]
-        f.hand_right_center = [1-rcx, rcy]
-        f.hands_center = [1-(lcx+rcx)/2.0, (lcy+rcy)/2.0]
+        # The rest is scalar math on plain floats, cheaper than numpy calls for a single frame;
+        # batch_mapping.map_batch evaluates the same math vectorized over recorded sessions
+        safe_angle, left_border, right_border, brake_min, brake_max, throttle_min, throttle_max = f.refresh_params()
 
         # Horizontal - 0 degree; Steer right to 90 degree; Steer left to -90
         f.steer_angle = math.degrees(math.atan2(rcx-lcx, rcy-lcy))+90.0
-        safe_angle = f.steering_safe_angle
-        f.left_pressure = clamp01((-f.steer_angle-safe_angle) / f.steering_left_border_angle)\
-            if f.steer_angle < 0 else 0.0
-        f.right_pressure = clamp01((f.steer_angle-safe_angle) / f.steering_right_border_angle) \
-            if f.steer_angle > 0 else 0.0
+        curves = self.curves
+        steer = curves.steering
+        f.left_pressure = steer(clamp01((-f.steer_angle-safe_angle) / left_border)) if f.steer_angle < 0 else 0.0
+        f.right_pressure = steer(clamp01((f.steer_angle-safe_angle) / right_border)) if f.steer_angle > 0 else 0.0
 
         # Throttle and brake
-        fist_dist = math.dist(f.hand_left_center, f.hand_right_center)
-        fist_radius = fist_dist * 0.5
-        if fist_radius < f.brake_radius_max:  # brake
-            f.brake_pressure = clamp01((f.brake_radius_max - fist_radius) / (f.brake_radius_max - f.brake_radius_min))
+        fist_radius = math.hypot(rcx-lcx, rcy-lcy) * 0.5
+        if fist_radius < brake_max:  # brake
+            f.brake_pressure = curves.brake(clamp01((brake_max - fist_radius) / (brake_max - brake_min)))
             f.throttle_pressure = 0.0
-        if fist_radius > f.throttle_radius_min:  # throttle
-            f.throttle_pressure = clamp01((fist_radius - f.throttle_radius_min) / (f.throttle_radius_max - f.throttle_radius_min))
+        if fist_radius > throttle_min:  # throttle
+            f.throttle_pressure = curves.throttle(clamp01((fist_radius - throttle_min) / (throttle_max - throttle_min)))
             f.brake_pressure = 0.0
 
         # shoulder_pts = [L(landmarks, i) for i in self.body_shoulder_indices]
@@ -159,8 +221,11 @@ class PoseControlMapper:
         #     f.throttle_pressure = 0.0
         #     f.brake_pressure = clamp01((brake_thresh - throttle_ratio) / throttle_real_dist)
 
+        if stamp is not None:
+            stamp.t_mapped = time.perf_counter()
         return f
 
+    @profiled()
     def trigger_control(self):
         """
         Trigger corresponding game control to the virtual controller based on the extracted features.
@@ -176,3 +241,82 @@ class PoseControlMapper:
         gp.throttle(f.throttle_pressure)
         gp.brake(f.brake_pressure)
 
+        # glass-to-control latency of the frame the features came from
+        if f.stamp is not None and self.ctx.latency is not None:
+            f.stamp.t_emitted = time.perf_counter()
+            self.ctx.latency.record(f.stamp)
+            f.stamp = None  # record each frame once
+
+    def neutral_control(self):
+        """
+        Centre the steering and release throttle and brake, e.g. while an automatic calibration asks for poses.
+        """
+
+        gp = self.ctx.gamepad
+        gp.steer(0.0)
+        gp.throttle(0.0)
+        gp.brake(0.0)
+        self.features.stamp = None  # no control was emitted for this frame
+
+
+def _mean_xy(landmark, indices) -> tuple:
+    """Mean (x, y) of the given landmarks of a NormalizedLandmarkList.landmark, in plain floats."""
+    x = y = 0.0
+    for i in indices:
+        p = landmark[i]
+        x += p.x
+        y += p.y
+    return x / len(indices), y / len(indices)
+
+
+def _hand_weights() -> np.ndarray:
+    weights = np.zeros((2, NUM_LANDMARKS))
+    weights[0, PoseControlMapper.left_hand_indices] = 1.0 / len(PoseControlMapper.left_hand_indices)
+    weights[1, PoseControlMapper.right_hand_indices] = 1.0 / len(PoseControlMapper.right_hand_indices)
+    return weights
+
+
+HAND_WEIGHTS = _hand_weights()
+"""(2, 33) averaging weights, HAND_WEIGHTS @ landmarks[..., :2] gives the (left, right) hand centers (x, y)"""
+
+
+def hand_geometry(arr: np.ndarray):
+    """
+    Hand geometry of landmark arrays of shape (..., 33, 4), e.g. one frame (33, 4) or a session (T, 33, 4).
+    :return: (hand centers (..., 2, 2) as (left, right) x (x, y) in image coordinates, steer angle in degrees (...),
+        fist radius (...))
+    """
+    centers = np.matmul(HAND_WEIGHTS, arr[..., :2])
+    return (centers, *center_geometry(centers))
+
+
+def center_geometry(centers: np.ndarray):
+    """
+    Steer angle in degrees and fist radius of hand centers of shape (..., 2, 2), (left, right) x (x, y).
+    """
+    dx = centers[..., 1, 0] - centers[..., 0, 0]
+    dy = centers[..., 1, 1] - centers[..., 0, 1]
+    # Horizontal - 0 degree; Steer right to 90 degree; Steer left to -90
+    return np.degrees(np.arctan2(dx, dy)) + 90.0, 0.5 * np.hypot(dx, dy)
+
+
+def steer_ramp(steer_angle, safe_angle, left_border, right_border):
+    """
+    Signed linear steering pressure in [-1, 1], left < 0 < right, before the response curve.
+    Only the side the wheel is turned to gets pressure, so both sides share one expression.
+    """
+    border = np.where(steer_angle > 0, right_border, left_border)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ramp = np.clip((np.abs(steer_angle) - safe_angle) / border, 0.0, 1.0)
+    return ramp * np.sign(steer_angle)
+
+
+def pedal_ramps(fist_radius, brake_min, brake_max, throttle_min, throttle_max):
+    """
+    Linear brake and throttle pressures in [0, 1] before the response curves, meaningful inside the brake zone
+    (fist_radius < brake_max) and the throttle zone (fist_radius > throttle_min) respectively.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        brake = np.clip((brake_max - fist_radius) / (brake_max - brake_min), 0.0, 1.0)
+        throttle = np.clip((fist_radius - throttle_min) / (throttle_max - throttle_min), 0.0, 1.0)
+    return brake, throttle
@@ -0,0 +1,63 @@
+"""
+Group: Controller Liberators
+Versioned, thread-safe store of the tuning parameters.
+
+The calibration window runs its Tk mainloop on a thread of its own while the pose loop reads the parameters
+every frame. Both sides only meet in this store: writers publish a batch of changes as a new immutable
+snapshot, readers take the current snapshot with a single reference read and compare its version with the
+one they used last, so per frame nothing is locked, copied or looked up unless a parameter changed.
+- the Tk thread publishes slider changes in batches (see TKParamWindow) and applies published changes to
+  its widgets itself, so no other thread calls into Tk; its batches are conditional on the snapshot version
+  they were computed from, so they never overwrite a concurrently published preset
+- applying a preset publishes its values, with or without calibration window
+
+Usage:
+    store = ParamStore()
+    store.publish({"brake radius min": 0.1, "brake radius max": 0.19})
+    snapshot = store.snapshot
+    if snapshot.version != last_version:
+        rebuild(snapshot.values)
+"""
+
+import threading
+from types import MappingProxyType
+from typing import Any, Mapping, NamedTuple, Optional
+
+
+class ParamSnapshot(NamedTuple):
+    """
+    Immutable state of the store.
+    """
+    version: int  # increases with every published batch of changes
+    values: Mapping[str, Any]  # read-only parameter name -> value
+
+
+class ParamStore:
+    """
+    Copy-on-write parameter store: every publish creates a new snapshot, published snapshots never change.
+    """
+
+    def __init__(self, values: Mapping[str, Any] = None):
+        self._lock = threading.Lock()  # serializes writers, readers never take it
+        self.snapshot: ParamSnapshot = ParamSnapshot(0, MappingProxyType(dict(values or {})))  # current state
+
+    def publish(self, changes: Mapping[str, Any], expected_version: Optional[int] = None) -> Optional[ParamSnapshot]:
+        """
+        Publish a batch of changed parameters as one new snapshot.
+        :param changes: parameter name -> new value
+        :param expected_version: only publish onto this snapshot version, for changes computed from a snapshot
+        :return: the current snapshot, the previous one when nothing changed, None when the store moved past
+            expected_version and nothing was published
+        """
+        with self._lock:
+            current = self.snapshot
+            if expected_version is not None and current.version != expected_version:
+                return None
+            values = current.values
+            if all(k in values and values[k] == v for k, v in changes.items()):
+                return current
+            merged = dict(values)
+            merged.update(changes)
+            # A single reference assignment, readers see either the whole old or the whole new snapshot
+            self.snapshot = ParamSnapshot(current.version + 1, MappingProxyType(merged))
+            return self.snapshot
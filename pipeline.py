@@ -0,0 +1,203 @@
+"""
+Group: Controller Liberators
+Pipelined execution of the capture / detect / render+control stages.
+
+Capture and pose inference run on their own threads and talk to the main thread (which owns pygame and
+the virtual controller) through bounded queues. The back-pressure policy is latest-wins: when a queue is
+full the oldest item is dropped, so a slow downstream stage always resumes on the newest data instead of
+working through a backlog. Each stage keeps its own timing statistics, and every frame carries its
+FrameStamp through the queues for glass-to-control latency tracing.
+
+RGB frames come from a FramePool: the capture stage converts into a pooled buffer, and buffers return to
+the pool when dropped by a queue or released by the main thread after display.
+
+Usage:
+    pipeline = Pipeline(camera, detector).start()
+    ret, landmarks, frame, stamp, fresh = pipeline.get()
+    ...
+    pipeline.stop()
+"""
+
+import threading
+import time
+from collections import deque
+
+import cv2
+from capture import FramePool
+from latency import FrameStamp
+
+
+class LatestQueue:
+    """
+    Bounded queue dropping the oldest item when full.
+    """
+
+    def __init__(self, maxsize: int = 1, on_drop=None):
+        self._items = deque()
+        self._on_drop = on_drop  # called with every item discarded by back-pressure
+        self._maxsize: int = max(1, maxsize)
+        self._cond = threading.Condition()
+        self._closed: bool = False
+        self.dropped_count: int = 0  # items discarded by back-pressure
+
+    def put(self, item) -> None:
+        with self._cond:
+            if len(self._items) >= self._maxsize:
+                dropped = self._items.popleft()
+                self.dropped_count += 1
+                if self._on_drop:
+                    self._on_drop(dropped)
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout: float = None):
+        """
+        Pop the oldest queued item, return None on timeout or when the queue is closed and empty.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self._closed, timeout=timeout):
+                return None
+            return self._items.popleft() if self._items else None
+
+    def close(self) -> None:
+        """Wake up all waiting consumers, subsequent get() returns None once drained."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class StageStats:
+    """
+    Timing statistics of a single pipeline stage.
+    """
+
+    def __init__(self, name: str, ema_alpha: float = 0.1):
+        self.name: str = name
+        self.ema_alpha: float = ema_alpha
+        self.count: int = 0  # processed items
+        self.total_time: float = 0.0  # seconds spent in the stage
+        self.ema_ms: float = 0.0  # exponentially smoothed stage time in milliseconds
+        self.max_ms: float = 0.0  # worst stage time in milliseconds
+
+    def add(self, seconds: float) -> None:
+        ms = seconds * 1000.0
+        self.count += 1
+        self.total_time += seconds
+        self.ema_ms = ms if self.count == 1 else self.ema_ms + self.ema_alpha * (ms - self.ema_ms)
+        self.max_ms = max(self.max_ms, ms)
+
+    def __str__(self):
+        mean_ms = self.total_time * 1000.0 / self.count if self.count else 0.0
+        return f"{self.name}: {self.ema_ms:.1f} ms (mean {mean_ms:.1f}, max {self.max_ms:.1f}, n={self.count})"
+
+
+class Pipeline:
+    """
+    Run capture and pose detection concurrently, delivering detection results to the main thread.
+    """
+
+    def __init__(self, camera, detector, queue_size: int = 1, stats_interval: float = 5.0):
+        self.camera = camera  # frame source with cv2.VideoCapture-like read()
+        self.detector = detector  # Detector instance
+        self.profiler = detector.ctx.profiler
+
+        self.frame_pool = FramePool()  # RGB frame buffers shared by the stages
+        self._detect_queue = LatestQueue(queue_size, self._release_capture)  # capture -> detect
+        self._result_queue = LatestQueue(queue_size, self._release_result)  # detect -> render+control
+        self._threads = []
+        self._running: bool = False
+
+        self.stats = {name: StageStats(name) for name in ("capture", "detect", "render")}
+        self.stats_interval: float = stats_interval  # seconds between stage statistics reports, 0 to disable
+        self._last_report: float = time.perf_counter()
+
+    def start(self) -> "Pipeline":
+        """
+        Start the capture and detect threads, return self for chaining.
+        """
+        if self._running:
+            return self
+        self._running = True
+        for name, target in (("pipeline-capture", self._capture_loop), ("pipeline-detect", self._detect_loop)):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def _capture_loop(self) -> None:
+        stats = self.stats["capture"]
+        while self._running:
+            t0 = time.perf_counter()
+            with self.profiler.span("capture"):
+                ret, frame = self.camera.read()
+            if not ret:
+                break
+            stamp = FrameStamp(self.camera.frame_seq, self.camera.frame_timestamp)
+            with self.profiler.span("cvtColor"):
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.frame_pool.acquire_like(frame))
+            stats.add(time.perf_counter() - t0)
+            self._detect_queue.put((frame, stamp))
+        self._detect_queue.close()
+
+    def _detect_loop(self) -> None:
+        stats = self.stats["detect"]
+        while self._running:
+            item = self._detect_queue.get()
+            if item is None:
+                break
+            frame, stamp = item
+            t0 = time.perf_counter()
+            landmarks, out_frame = self.detector.get_landmarks(frame, stamp)
+            stats.add(time.perf_counter() - t0)
+            if out_frame is not frame:
+                self.frame_pool.release(frame)  # the detector answered with another frame (process pool)
+            self._result_queue.put((landmarks, out_frame, self.detector.last_stamp, self.detector.fresh))
+        self._result_queue.close()
+
+    def get(self, timeout: float = 2.0):
+        """
+        Wait for the next detection result.
+        Returns (ret, landmarks, frame, stamp, fresh); ret is False when the pipeline stopped or timed out,
+        stamp is the FrameStamp of the frame the landmarks belong to, fresh as Detector.fresh.
+        Hand the frame back with release() once it has been displayed.
+        """
+        item = self._result_queue.get(timeout)
+        if item is None:
+            return False, None, None, None, False
+        return (True,) + item
+
+    def _release_capture(self, item) -> None:
+        self.frame_pool.release(item[0])
+
+    def _release_result(self, item) -> None:
+        self.release(item[1])
+
+    def release(self, frame) -> None:
+        """Return a frame obtained from get() to the buffer pool, or to the detector's process pool."""
+        if not self.detector.release_frame(frame):
+            self.frame_pool.release(frame)
+
+    def add_render_time(self, seconds: float) -> None:
+        """Record time spent by the main thread rendering and triggering controls for one result."""
+        self.stats["render"].add(seconds)
+        now = time.perf_counter()
+        if self.stats_interval and now - self._last_report >= self.stats_interval:
+            self._last_report = now
+            self.report()
+
+    def report(self) -> None:
+        dropped = f"dropped: detect queue {self._detect_queue.dropped_count}, " \
+                  f"result queue {self._result_queue.dropped_count}"
+        print(" | ".join(str(s) for s in self.stats.values()) + " | " + dropped)
+
+    def stop(self) -> None:
+        """
+        Stop the stage threads.
+        """
+        self._running = False
+        self._detect_queue.close()
+        self._result_queue.close()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        self._threads.clear()
+        self.report()
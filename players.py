@@ -0,0 +1,287 @@
+"""
+Group: Controller Liberators
+Multi-player mode: N cameras driving N virtual controllers in parallel.
+
+Every player runs its whole pipeline, camera -> Detector -> PoseControlMapper -> controller, in a process
+of its own with its own headless Context, presets and controller backend. Players therefore scale across
+cores and a slow detector only slows down its own player. The main process only owns the shared overlay
+window: after every detection each player resizes its frame to the tile size into a shared memory slot and
+publishes the slot index with its control features, the overlay renders the newest snapshot of every player
+into its own tile. Only the small snapshot tuples are pickled, slots return to their player once replaced.
+
+Players are configured in [Player.<name>] sections of sysconfig.ini and enabled with [Players] enabled.
+
+Usage:
+    players = PlayerManager(config, "sysconfig.ini").start()
+    players.poll()
+    players.render(gui)
+    players.stop()
+"""
+
+import configparser
+import math
+import multiprocessing as mproc
+import queue
+import time
+from collections import deque
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+import numpy as np
+
+# Features copied into the snapshots sent to the overlay, the ControlFeature itself holds the player's Context
+SNAPSHOT_FEATURES = ("hand_left_center", "hand_right_center", "hands_center", "steer_angle",
+                     "left_pressure", "right_pressure", "brake_pressure", "throttle_pressure", "handbrake_active",
+                     "brake_radius_min", "brake_radius_max", "throttle_radius_min", "throttle_radius_max")
+TILE_SLOTS = 3  # shared memory tile slots per player: one shown, one queued, one being written
+
+
+def _create_controller(kind: str, keys: str):
+    """
+    Create the controller backend of a player.
+    :param kind: vgamepad, keyboard or null
+    :param keys: keyboard keys as 'left,right,throttle,brake', blank for the defaults
+    """
+    kind = kind.strip().lower()
+    if kind == "vgamepad":
+        from control.gamepad import VGamepadWin
+        return VGamepadWin(skip=False)
+    if kind == "keyboard":
+        from control.keyboard import KeyboardController
+        names = [k.strip() for k in keys.split(",") if k.strip()]
+        return KeyboardController(dict(zip(("left", "right", "throttle", "brake"), names)))
+    if kind == "null":
+        from control.null import NullController
+        return NullController()
+    raise ValueError(f"Unknown controller '{kind}', expected vgamepad, keyboard or null")
+
+
+def _player_main(name: str, config_path: str, section: str, tile_reso: tuple, slot_names: list, free_queue,
+                 snapshot_queue, stop_event) -> None:
+    """
+    Player process entry: run one complete player pipeline until stop_event is set.
+    """
+    import cv2
+    from context import Context
+    from presets import PresetManager
+    from detector import Detector
+    from mapping import PoseControlMapper
+    from capture import ThreadedCapture
+    from sources import open_source
+    from capture_profiles import parse_profiles
+    from latency import FrameStamp, LatencyTracker
+
+    config = configparser.ConfigParser()
+    config.read(config_path)
+    player_cfg = config[section]
+    # The player process already is the parallel unit, and player presets override the global default
+    config.set("MediaPipe", "inference_workers", "0")
+    if player_cfg.get("preset", fallback="").strip():
+        config.set("Preferences", "default_preset", player_cfg.get("preset"))
+
+    ctx = Context(config, headless=True)
+    preset_mgr = PresetManager(ctx)
+    profile = parse_profiles(player_cfg.get("profile", fallback=config.get("Capture", "profiles",
+                                                                          fallback="640x480@30")))[0]
+    camera = open_source(player_cfg.get("source", fallback="camera:0"), profile.resolution, profile.fps,
+                         realtime=config.getboolean("Capture", "realtime", fallback=True),
+                         loop=config.getboolean("Capture", "loop", fallback=False),
+                         fourcc=profile.fourcc, buffer_size=config.getint("Capture", "buffer_size", fallback=1))
+    if camera.live:
+        camera = ThreadedCapture(camera).start()  # offline sources deliver every frame
+    detector = Detector(ctx)
+    mapper = PoseControlMapper(ctx)
+    ctx.gamepad = _create_controller(player_cfg.get("controller", fallback="null"),
+                                     player_cfg.get("keys", fallback=""))
+    if config.getboolean("Latency", "trace", fallback=True):
+        ctx.latency = LatencyTracker()
+    preset_mgr.load_presets()
+
+    slots = [shared_memory.SharedMemory(name=n) for n in slot_names]
+    tiles = [np.ndarray((tile_reso[1], tile_reso[0], 3), dtype=np.uint8, buffer=shm.buf) for shm in slots]
+    free_slots = deque(range(len(slots)))  # slots this player may write, the overlay owns the others
+
+    rgb_frame = None
+    features = None  # snapshot features of the newest result
+    frames = 0
+    t_fps = time.perf_counter()
+    fps = 0.0
+    try:
+        while not stop_event.is_set():
+            ret, frame = camera.read()
+            if not ret:
+                print(f"Player {name}: cannot capture frame")
+                break
+            stamp = FrameStamp(camera.frame_seq, camera.frame_timestamp)
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb_frame)
+            landmarks, frame = detector.get_landmarks(rgb_frame, stamp)
+            if not landmarks:
+                features = None
+            elif detector.fresh:  # a repeated result keeps its features
+                f = mapper.extract_features(landmarks, detector.last_stamp)
+                mapper.trigger_control()
+                # Plain values, the queue pickles the snapshot later on its feeder thread
+                features = {k: getattr(f, k) for k in SNAPSHOT_FEATURES}
+                for k in ("hand_left_center", "hand_right_center", "hands_center"):
+                    features[k] = features[k].tolist()
+
+            frames += 1
+            now = time.perf_counter()
+            if now - t_fps >= 1.0:
+                fps, frames, t_fps = frames / (now - t_fps), 0, now
+
+            # Publish to the overlay, dropping the snapshot while the overlay holds every slot or the queue is full
+            while True:
+                try:
+                    free_slots.append(free_queue.get_nowait())  # slots the overlay has replaced
+                except queue.Empty:
+                    break
+            if not free_slots:
+                continue
+            slot = free_slots.popleft()
+            cv2.resize(frame, tile_reso, dst=tiles[slot], interpolation=cv2.INTER_AREA)
+            latency_ms = ctx.latency.last_ms if ctx.latency is not None and ctx.latency.count else 0.0
+            try:
+                snapshot_queue.put_nowait((name, slot, features, fps, latency_ms))
+            except queue.Full:
+                free_slots.append(slot)
+    finally:
+        del tiles
+        for shm in slots:
+            shm.close()
+        if ctx.latency:
+            print(f"Player {name}:")
+            ctx.latency.report()
+        camera.release()
+        ctx.gamepad.close()
+        detector.close()
+        ctx.close()
+
+
+class PlayerHandle:
+    """
+    Main process side of a player: its process and the newest snapshot it published.
+    """
+
+    def __init__(self, name: str, section: str):
+        self.name: str = name  # player name, the suffix of its [Player.<name>] section
+        self.section: str = section  # configuration section
+        self.process: Optional[mproc.Process] = None
+        self.slots: List[shared_memory.SharedMemory] = []  # tile slots shared with the player process
+        self.tiles: list = []  # numpy views onto the slots
+        self.free_queue = None  # slots handed back to the player
+        self.slot: Optional[int] = None  # slot of the newest tile, owned by the overlay until replaced
+        self.features: Optional[SimpleNamespace] = None  # newest control features, None without pose
+        self.fps: float = 0.0  # player pipeline frame rate
+        self.latency_ms: float = 0.0  # newest glass-to-control latency of the player
+
+    @property
+    def frame(self):
+        """Newest RGB frame at tile size, a view into shared memory, None before the first snapshot."""
+        return self.tiles[self.slot] if self.slot is not None else None
+
+
+class PlayerManager:
+    """
+    Start the player processes and collect their snapshots for the shared overlay.
+    """
+
+    def __init__(self, config: configparser.ConfigParser, config_path: str = "sysconfig.ini"):
+        self.config = config
+        self.config_path: str = config_path  # players re-read the configuration in their own process
+        self.players: List[PlayerHandle] = [PlayerHandle(s.partition(".")[2], s)
+                                            for s in config.sections() if s.startswith("Player.")]
+        if not self.players:
+            raise ValueError("Multi-player mode needs at least one [Player.<name>] section")
+        self._by_name: Dict[str, PlayerHandle] = {p.name: p for p in self.players}
+        players_cfg = config["Players"]
+        tile = players_cfg.get("tile_resolution", fallback="640x480").lower().partition("x")
+        self.tile_reso: tuple = (int(tile[0]), int(tile[2]))  # size of a player's tile in the overlay
+        self.columns: int = math.ceil(math.sqrt(len(self.players)))
+        self.rows: int = math.ceil(len(self.players) / self.columns)
+
+        self._mp = mproc.get_context("spawn")  # same start method on every platform
+        self._stop_event = self._mp.Event()
+        self._snapshots = self._mp.Queue(maxsize=2 * len(self.players))
+
+    @property
+    def window_resolution(self) -> tuple:
+        """Overlay window size fitting all player tiles."""
+        return self.columns * self.tile_reso[0], self.rows * self.tile_reso[1]
+
+    def tile_rect(self, index: int) -> tuple:
+        """(x, y, width, height) of the player tile at index."""
+        w, h = self.tile_reso
+        return (index % self.columns) * w, (index // self.columns) * h, w, h
+
+    def start(self) -> "PlayerManager":
+        w, h = self.tile_reso
+        for p in self.players:
+            p.slots = [shared_memory.SharedMemory(create=True, size=w * h * 3) for _ in range(TILE_SLOTS)]
+            p.tiles = [np.ndarray((h, w, 3), dtype=np.uint8, buffer=shm.buf) for shm in p.slots]
+            p.free_queue = self._mp.Queue()
+            p.process = self._mp.Process(
+                target=_player_main, name=f"player-{p.name}", daemon=True,
+                args=(p.name, self.config_path, p.section, self.tile_reso, [shm.name for shm in p.slots],
+                      p.free_queue, self._snapshots, self._stop_event))
+            p.process.start()
+        print(f"Started {len(self.players)} players: {', '.join(p.name for p in self.players)}")
+        return self
+
+    @property
+    def alive(self) -> bool:
+        """Whether any player is still running."""
+        return any(p.process is not None and p.process.is_alive() for p in self.players)
+
+    def poll(self) -> None:
+        """
+        Take every snapshot published since the last call, keeping the newest one per player.
+        """
+        while True:
+            try:
+                name, slot, features, fps, latency_ms = self._snapshots.get_nowait()
+            except queue.Empty:
+                break
+            p = self._by_name[name]
+            if p.slot is not None:
+                p.free_queue.put(p.slot)  # the player may overwrite the replaced tile
+            p.slot = slot
+            p.features = SimpleNamespace(**features) if features is not None else None
+            p.fps, p.latency_ms = fps, latency_ms
+
+    def render(self, gui) -> None:
+        """
+        Render every player's newest snapshot into its tile of the overlay.
+        """
+        for i, p in enumerate(self.players):
+            if p.frame is None:
+                continue
+            gui.set_viewport(self.tile_rect(i))
+            gui.render_np_frame(p.frame)
+            if p.features is not None:
+                gui.render_pose_features(p.features)
+                gui.render_game_controls(p.features)
+        gui.set_viewport(None)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop_event.set()
+        deadline = time.perf_counter() + timeout
+        for p in self.players:
+            if p.process is None:
+                continue
+            while p.process.is_alive() and time.perf_counter() < deadline:
+                self.poll()  # keep draining, a player blocked on a full queue could not exit
+                p.process.join(timeout=0.05)
+            if p.process.is_alive():
+                print(f"Player {p.name} did not stop, terminating")
+                p.process.terminate()
+        self._snapshots.close()
+        for p in self.players:
+            p.slot = None
+            p.tiles.clear()
+            if p.free_queue is not None:
+                p.free_queue.close()
+            for shm in p.slots:
+                shm.close()
+                shm.unlink()
+            p.slots.clear()
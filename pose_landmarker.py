@@ -0,0 +1,109 @@
+"""
+Group: Controller Liberators
+Pose detection backend built on the MediaPipe Tasks PoseLandmarker in LIVE_STREAM mode.
+
+Frames are handed to detect_async() with a monotonically increasing timestamp and the call returns at
+once; results arrive on a MediaPipe thread through the result callback. The graph drops frames internally
+while it is busy, so the caller never blocks on inference and always gets the newest result available.
+Results are converted into NormalizedLandmarkList protobufs, the same type mp.solutions.pose hands out,
+so drawing and PoseControlMapper work unchanged.
+
+The model bundle is not shipped with the repository, download it e.g. from
+https://storage.googleapis.com/mediapipe-models/pose_landmarker/pose_landmarker_full/float16/latest/pose_landmarker_full.task
+
+Usage:
+    live = LiveStreamPose("Models/pose_landmarker_full.task")
+    live.submit(rgb_frame, stamp)
+    landmarks, stamp, fresh = live.poll()
+    live.close()
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional
+import mediapipe as mp
+from mediapipe.framework.formats import landmark_pb2
+from mediapipe.tasks.python import BaseOptions
+from mediapipe.tasks.python import vision
+from latency import FrameStamp
+
+
+class LiveStreamPose:
+    """
+    Asynchronous pose landmarker, the newest result is picked up with poll().
+    """
+
+    def __init__(self, model_path: str, min_detection_confidence: float = 0.5,
+                 min_presence_confidence: float = 0.5, min_tracking_confidence: float = 0.5):
+        if not os.path.isfile(model_path):
+            raise FileNotFoundError(f"PoseLandmarker model not found: {model_path} "
+                                    "(see pose_landmarker.py for the download link)")
+        options = vision.PoseLandmarkerOptions(
+            base_options=BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            num_poses=1,
+            min_pose_detection_confidence=min_detection_confidence,
+            min_pose_presence_confidence=min_presence_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            output_segmentation_masks=False,
+            result_callback=self._on_result,
+        )
+        self.landmarker = vision.PoseLandmarker.create_from_options(options)
+
+        self._lock = threading.Lock()
+        self._last_timestamp_ms: int = -1  # detect_async requires strictly increasing timestamps
+        self._stamps = deque()  # (timestamp ms, FrameStamp) of the frames submitted and not answered yet
+        self._landmarks = None  # newest result, NormalizedLandmarkList or None without pose
+        self._result_stamp: Optional[FrameStamp] = None  # stamp of the frame of the newest result
+        self._fresh: bool = False  # a result arrived since the last poll()
+
+        self.submitted_count: int = 0  # frames handed to the graph
+        self.result_count: int = 0  # results received, the difference was dropped by the graph
+
+    def submit(self, frame, stamp: FrameStamp = None) -> None:
+        """
+        Hand an RGB frame to the graph without waiting for the result.
+        :param stamp: optional FrameStamp of the frame, returned with its result by poll()
+        """
+        t = stamp.t_capture if stamp is not None else time.perf_counter()
+        timestamp_ms = max(int(t * 1000.0), self._last_timestamp_ms + 1)
+        self._last_timestamp_ms = timestamp_ms
+        with self._lock:
+            self._stamps.append((timestamp_ms, stamp))
+        # mp.Image copies the pixels, the caller may reuse its frame buffer right away
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=frame)
+        self.landmarker.detect_async(image, timestamp_ms)
+        self.submitted_count += 1
+
+    def _on_result(self, result, output_image, timestamp_ms: int) -> None:
+        # Runs on a MediaPipe thread
+        landmarks = None
+        if result.pose_landmarks:
+            landmarks = landmark_pb2.NormalizedLandmarkList()
+            for lm in result.pose_landmarks[0]:
+                landmarks.landmark.add(x=lm.x, y=lm.y, z=lm.z, visibility=lm.visibility or 0.0)
+        with self._lock:
+            stamp = None
+            while self._stamps and self._stamps[0][0] <= timestamp_ms:  # older entries were dropped by the graph
+                ts, stamp = self._stamps.popleft()
+                if ts != timestamp_ms:
+                    stamp = None
+            self._landmarks = landmarks
+            self._result_stamp = stamp
+            self._fresh = True
+            self.result_count += 1
+
+    def poll(self):
+        """
+        Newest result without waiting.
+        :return: (landmarks, stamp, fresh), fresh is False when no result arrived since the last call
+        """
+        with self._lock:
+            fresh = self._fresh
+            self._fresh = False
+            return self._landmarks, self._result_stamp, fresh
+
+    def close(self) -> None:
+        self.landmarker.close()
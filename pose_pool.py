@@ -0,0 +1,182 @@
+"""
+Group: Controller Liberators
+Pose inference spread over a pool of worker processes.
+
+Each worker owns its own MediaPipe Pose graph. Frames are written into multiprocessing.shared_memory slots
+instead of being pickled, only a small task tuple (sequence number, slot index, slot name) crosses the
+process boundary. Workers reply with the serialized landmark protobuf tagged with the sequence number, and
+the pool hands results back strictly in submission order. The frame of a result is handed out as a view
+into its slot, which is reused only after the caller released it; slots are added while none is free.
+
+Usage:
+    pool = PosePool(pose_kwargs, workers=3)
+    pool.submit(rgb_frame)
+    landmarks, frame = pool.receive()
+    ...  # display the frame
+    pool.release(frame)
+    pool.close()
+"""
+
+import multiprocessing as mproc
+import threading
+from multiprocessing import shared_memory
+from collections import deque
+from typing import Dict, Optional
+import numpy as np
+
+
+def _pose_worker(pose_kwargs: dict, frame_shape: tuple, task_queue, result_queue) -> None:
+    """
+    Worker process entry: run pose inference on frames placed in shared memory slots.
+    """
+    import mediapipe as mp
+
+    slots = {}  # slot index -> SharedMemory, attached on first use since the pool adds slots on demand
+    frames = {}  # slot index -> numpy view onto the slot
+    pose = mp.solutions.pose.Pose(**pose_kwargs)
+    result_queue.put(None)  # ready signal, the graph is built
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            seq, slot, name = task
+            frame = frames.get(slot)
+            if frame is None:
+                slots[slot] = shared_memory.SharedMemory(name=name)
+                frame = frames[slot] = np.ndarray(frame_shape, dtype=np.uint8, buffer=slots[slot].buf)
+            frame.flags.writeable = False
+            results = pose.process(frame)
+            frame.flags.writeable = True
+            payload = results.pose_landmarks.SerializeToString() if results.pose_landmarks else None
+            result_queue.put((seq, slot, payload))
+    finally:
+        pose.close()
+        frames.clear()
+        for shm in slots.values():
+            shm.close()
+
+
+class PosePool:
+    """
+    Pool of pose inference worker processes fed through shared memory frame slots.
+    """
+
+    def __init__(self, pose_kwargs: dict, workers: int = 2):
+        self.pose_kwargs: dict = pose_kwargs  # keyword arguments of mp.solutions.pose.Pose
+        self.workers: int = max(1, workers)  # number of worker processes, also the max frames in flight
+
+        self._mp = mproc.get_context("spawn")  # same start method on every platform
+        self._frame_shape: Optional[tuple] = None
+        self._slots = []  # SharedMemory blocks
+        self._slot_frames = []  # numpy views onto the slots
+        self._free_slots = deque()
+        self._held_slots = set()  # slots whose frame was handed out by receive() and not released yet
+        self._slot_lock = threading.Lock()  # release() may be called from another thread than submit()
+        self._procs = []
+        self._task_queue = None
+        self._result_queue = None
+
+        self._next_seq: int = 0  # sequence number of the next submitted frame
+        self._expected_seq: int = 0  # sequence number of the next result to hand out
+        self._pending: Dict[int, tuple] = {}  # out-of-order results waiting for reordering
+
+    @property
+    def in_flight(self) -> int:
+        """Number of submitted frames whose result has not been handed out yet."""
+        return self._next_seq - self._expected_seq
+
+    def _start(self, frame_shape: tuple) -> None:
+        from mediapipe.framework.formats import landmark_pb2
+        self._landmark_list = landmark_pb2.NormalizedLandmarkList
+
+        self._frame_shape = frame_shape
+        for _ in range(self.workers + 1):  # one slot per frame in flight plus the one being displayed
+            self._free_slots.append(self._add_slot())
+
+        self._task_queue = self._mp.Queue()
+        self._result_queue = self._mp.Queue()
+        for i in range(self.workers):
+            proc = self._mp.Process(target=_pose_worker, name=f"pose-worker-{i}", daemon=True,
+                                    args=(self.pose_kwargs, frame_shape, self._task_queue, self._result_queue))
+            proc.start()
+            self._procs.append(proc)
+        for _ in range(self.workers):
+            self._result_queue.get()  # wait for every graph to be built
+        print(f"Pose pool started: {self.workers} workers, frame {frame_shape}")
+
+    def _add_slot(self) -> int:
+        shm = shared_memory.SharedMemory(create=True, size=int(np.prod(self._frame_shape)))
+        self._slots.append(shm)
+        self._slot_frames.append(np.ndarray(self._frame_shape, dtype=np.uint8, buffer=shm.buf))
+        return len(self._slots) - 1
+
+    def submit(self, frame: np.ndarray) -> None:
+        """
+        Copy an RGB frame into a free slot and queue it for inference.
+        The caller must receive() a result first when every worker is busy (in_flight == workers).
+        """
+        if self._frame_shape is None:
+            self._start(frame.shape)
+        if frame.shape != self._frame_shape:
+            raise ValueError(f"Frame shape {frame.shape} differs from pool frame shape {self._frame_shape}")
+        if self.in_flight >= self.workers:
+            raise RuntimeError("All workers busy, receive() a result before submitting more frames")
+
+        with self._slot_lock:
+            # Frames still held by the caller keep their slots, e.g. results queued for display
+            slot = self._free_slots.popleft() if self._free_slots else self._add_slot()
+        np.copyto(self._slot_frames[slot], frame)
+        self._task_queue.put((self._next_seq, slot, self._slots[slot].name))
+        self._next_seq += 1
+
+    def receive(self):
+        """
+        Block until the result of the oldest in-flight frame is available.
+        Returns (landmarks, frame): landmarks is a NormalizedLandmarkList or None, frame is a view into the
+        shared memory slot of the frame the landmarks were detected on, valid until passed to release().
+        """
+        if self.in_flight == 0:
+            raise RuntimeError("No frame in flight")
+        while self._expected_seq not in self._pending:
+            seq, slot, payload = self._result_queue.get()
+            self._pending[seq] = (slot, payload)
+
+        slot, payload = self._pending.pop(self._expected_seq)
+        self._expected_seq += 1
+        with self._slot_lock:
+            self._held_slots.add(slot)
+        landmarks = self._landmark_list.FromString(payload) if payload is not None else None
+        return landmarks, self._slot_frames[slot]
+
+    def release(self, frame: np.ndarray) -> bool:
+        """
+        Hand a frame returned by receive() back once it has been displayed, its slot is then reused.
+        :return: whether the frame was a frame of this pool
+        """
+        with self._slot_lock:
+            for slot in self._held_slots:
+                if self._slot_frames[slot] is frame:
+                    self._held_slots.discard(slot)
+                    self._free_slots.append(slot)
+                    return True
+        return False
+
+    def close(self) -> None:
+        """
+        Stop the workers and release the shared memory slots.
+        """
+        for _ in self._procs:
+            self._task_queue.put(None)
+        for proc in self._procs:
+            proc.join(timeout=5.0)
+            if proc.is_alive():
+                proc.terminate()
+        self._procs.clear()
+        self._slot_frames.clear()
+        self._held_slots.clear()
+        self._free_slots.clear()
+        for shm in self._slots:
+            shm.close()
+            shm.unlink()
+        self._slots.clear()
@@ -36,6 +36,20 @@ class Preset:
         }
         """Mapping settings"""
 
+        self.filter = {
+            "type": "none",  # Hand position filter: none, one_euro or kalman (see control_filter.py)
+            "prediction": 0.0,  # Share of the measured latency to extrapolate the hands by, 0 to disable
+        }
+        """Jitter filter and latency prediction settings"""
+
+        self.curves = {
+            # Response curve per pressure: linear, power, s-curve or points (see response_curves.py)
+            "steering": {"type": "linear", "deadzone": 0.0},
+            "throttle": {"type": "linear", "deadzone": 0.0},
+            "brake": {"type": "linear", "deadzone": 0.0},
+        }
+        """Response curves of the pressures"""
+
 
 class PresetManager:
     """
@@ -53,6 +67,7 @@ class PresetManager:
 
         self.register_preset("default", Preset())  # add default preset
         self.__on_update_preset: List[Callable] = list()  # delegates on applying a new preset
+        self.callback_dispatcher: Optional[Callable] = None  # schedules the delegates, None to call directly
 
     def register_preset(self, name: str, data: Preset) -> None:
         """Register a new preset.
@@ -91,13 +106,19 @@ class PresetManager:
             self.active_preset_name = name
             self.active_preset = self._presets[name]
             print(f"Applied preset: {name}")
-            for callback in self.__on_update_preset:
-                callback(self.active_preset)
+            if self.callback_dispatcher is not None:
+                self.callback_dispatcher(self.__notify_preset_update, self.active_preset)
+            else:
+                self.__notify_preset_update(self.active_preset)
             return True
 
         print(f"Not found preset named {name}")
         return False
 
+    def __notify_preset_update(self, preset: Preset) -> None:
+        for callback in self.__on_update_preset:
+            callback(preset)
+
     def load_presets(self) -> None:
         """Load presets from local file."""
         presets = os.listdir(self.presets_path)
@@ -125,6 +146,8 @@ class PresetManager:
         preset = Preset()
         preset.visual = raw.get("visual", preset.visual)
         preset.mapping = raw.get("mapping", preset.mapping)
+        preset.filter = raw.get("filter", preset.filter)
+        preset.curves = raw.get("curves", preset.curves)
 
         preset.name = os.path.splitext(os.path.basename(path))[0]
         self.register_preset(preset.name, preset)
@@ -144,6 +167,8 @@ class PresetManager:
         config = dict()
         config['visual'] = preset.visual
         config['mapping'] = preset.mapping
+        config['filter'] = preset.filter
+        config['curves'] = preset.curves
         path = os.path.join(self.presets_path, f"{name}.json")
 
         with open(path, 'w') as configfile:
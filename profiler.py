@@ -0,0 +1,169 @@
+"""
+Group: Controller Liberators
+Lightweight per-stage profiling.
+
+Stages are wrapped with Profiler.span() context managers or the @profiled decorator. Spans are written
+into a preallocated ring buffer (no allocation per span besides the context manager object) and can be
+exported as Chrome trace-event JSON (open in chrome://tracing or https://ui.perfetto.dev) or as CSV.
+When profiling is disabled span() returns a shared no-op context manager, so instrumented code costs
+one method call.
+
+Usage:
+    with ctx.profiler.span("capture"):
+        ret, frame = camera.read()
+
+    @profiled("render_np_frame")
+    def render_np_frame(self, np_frame): ...
+"""
+
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+import numpy as np
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("_profiler", "_name_id", "_start")
+
+    def __init__(self, profiler, name_id: int):
+        self._profiler = profiler
+        self._name_id = name_id
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._profiler._add(self._name_id, self._start, time.perf_counter())
+        return False
+
+
+class Profiler:
+    """
+    Collect timed spans into a ring buffer.
+    """
+
+    def __init__(self, enabled: bool = False, capacity: int = 1 << 18):
+        self.enabled: bool = enabled  # record spans
+        self.capacity: int = capacity  # spans kept, the oldest are overwritten
+        self._names = {}  # span name -> id
+        self._name_list = []  # id -> span name
+        self._lock = threading.Lock()
+        self._counter = itertools.count()  # atomic under the GIL, safe for concurrent stage threads
+        self._start = np.zeros(capacity, dtype=np.float64)
+        self._end = np.zeros(capacity, dtype=np.float64)
+        self._name_id = np.zeros(capacity, dtype=np.int32)
+        self._thread_id = np.zeros(capacity, dtype=np.int64)
+        self._count: int = 0
+        self._origin: float = time.perf_counter()  # time zero of exported traces
+
+    def _get_name_id(self, name: str) -> int:
+        name_id = self._names.get(name)
+        if name_id is None:
+            with self._lock:
+                name_id = self._names.setdefault(name, len(self._name_list))
+                if name_id == len(self._name_list):
+                    self._name_list.append(name)
+        return name_id
+
+    def span(self, name: str):
+        """
+        Context manager timing the enclosed block as a span named name.
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, self._get_name_id(name))
+
+    def _add(self, name_id: int, start: float, end: float) -> None:
+        n = next(self._counter)
+        i = n % self.capacity
+        self._start[i] = start
+        self._end[i] = end
+        self._name_id[i] = name_id
+        self._thread_id[i] = threading.get_ident()
+        self._count = max(self._count, n + 1)
+
+    def _ordered(self):
+        """Indices of the recorded spans in chronological order of recording."""
+        if self._count <= self.capacity:
+            return np.arange(self._count)
+        split = self._count % self.capacity
+        return np.concatenate((np.arange(split, self.capacity), np.arange(split)))
+
+    def summary(self) -> dict:
+        """
+        {span name: (count, mean ms, max ms)} over the recorded spans.
+        """
+        idx = self._ordered()
+        dur = (self._end[idx] - self._start[idx]) * 1000.0
+        names = self._name_id[idx]
+        ret = {}
+        for name_id, name in enumerate(self._name_list):
+            d = dur[names == name_id]
+            if d.size:
+                ret[name] = (int(d.size), float(d.mean()), float(d.max()))
+        return ret
+
+    def report(self) -> None:
+        for name, (count, mean_ms, max_ms) in sorted(self.summary().items(), key=lambda kv: -kv[1][1]):
+            print(f"  {name:<24} n={count:<7} mean {mean_ms:7.3f} ms  max {max_ms:7.3f} ms")
+
+    def export_chrome_trace(self, path: str) -> None:
+        """
+        Write the spans as Chrome trace-event JSON (complete "X" events, microseconds).
+        """
+        pid = os.getpid()
+        events = [{"name": self._name_list[self._name_id[i]], "ph": "X", "pid": pid,
+                   "tid": int(self._thread_id[i]),
+                   "ts": (self._start[i] - self._origin) * 1e6,
+                   "dur": (self._end[i] - self._start[i]) * 1e6}
+                  for i in self._ordered()]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        print(f"Profile trace written to {path} ({len(events)} spans)")
+
+    def export_csv(self, path: str) -> None:
+        """
+        Write the spans as CSV: name, thread, start_ms, duration_ms.
+        """
+        with open(path, "w") as f:
+            f.write("name,thread,start_ms,duration_ms\n")
+            for i in self._ordered():
+                f.write(f"{self._name_list[self._name_id[i]]},{self._thread_id[i]},"
+                        f"{(self._start[i] - self._origin) * 1000.0:.4f},"
+                        f"{(self._end[i] - self._start[i]) * 1000.0:.4f}\n")
+        print(f"Profile spans written to {path}")
+
+
+def profiled(name: str = None):
+    """
+    Decorator timing a method with the profiler of its owner's context (self.ctx.profiler).
+    """
+    def decorator(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            prof = self.ctx.profiler
+            if not prof.enabled:
+                return fn(self, *args, **kwargs)
+            with prof.span(label):
+                return fn(self, *args, **kwargs)
+        return wrapper
+    return decorator
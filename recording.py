@@ -0,0 +1,156 @@
+"""
+Group: Controller Liberators
+Compact binary landmark recording and memory-mapped replay.
+
+A recording is an append-only file: a 16 byte header followed by fixed-size records of
+(timestamp, frame index, 33 x (x, y, z, visibility)). Replay maps the file with numpy.memmap, so a session
+of any length opens instantly and the landmarks are available as one (T, 33, 4) array. Captured sessions
+can then be pushed through the mapping and output stages much faster than real time, without MediaPipe.
+
+Usage:
+    with LandmarkRecorder("Recordings/session.lmrec") as rec:
+        rec.write(timestamp, frame_index, landmarks)
+
+    replay = LandmarkReplay("Recordings/session.lmrec")
+    replay.landmarks  # (T, 33, 4) float32
+"""
+
+import os
+import struct
+import numpy as np
+from landmarks import NUM_LANDMARKS, landmarks_to_array, array_to_landmarks
+
+RECORD_MAGIC = b"CLLM"
+RECORD_VERSION = 1
+HEADER_FORMAT = "<4sIII"  # magic, version, landmarks per record, record size in bytes
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+RECORD_DTYPE = np.dtype([
+    ("timestamp", "<f8"),  # monotonic capture time in seconds
+    ("frame_index", "<i8"),  # index of the captured frame
+    ("landmarks", "<f4", (NUM_LANDMARKS, 4)),  # (x, y, z, visibility) per landmark
+])
+
+
+class LandmarkRecorder:
+    """
+    Append detections to a binary landmark recording.
+    """
+
+    def __init__(self, path: str, flush_every: int = 30):
+        self.path: str = path
+        self.flush_every: int = flush_every  # flush the file every N records
+        self.count: int = 0  # records written by this recorder
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not is_new:
+            _read_header(path)  # refuse to append to an incompatible file
+        self._file = open(path, "ab")
+        if is_new:
+            self._file.write(struct.pack(HEADER_FORMAT, RECORD_MAGIC, RECORD_VERSION,
+                                         NUM_LANDMARKS, RECORD_DTYPE.itemsize))
+        self._record = np.zeros(1, dtype=RECORD_DTYPE)  # reused record buffer
+
+    def write(self, timestamp: float, frame_index: int, landmarks) -> None:
+        """
+        Append one detection.
+        :param landmarks: NormalizedLandmarkList or (33, 4) array
+        """
+        rec = self._record
+        rec["timestamp"] = timestamp
+        rec["frame_index"] = frame_index
+        if isinstance(landmarks, np.ndarray):
+            rec["landmarks"][0] = landmarks
+        else:
+            landmarks_to_array(landmarks, out=rec["landmarks"][0])
+        self._file.write(self._record.tobytes())
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file:
+            self._file.close()
+            self._file = None
+            print(f"Recorded {self.count} landmark sets to {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _read_header(path: str) -> None:
+    with open(path, "rb") as f:
+        raw = f.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE:
+        raise ValueError(f"Not a landmark recording (truncated header): {path}")
+    magic, version, num_landmarks, record_size = struct.unpack(HEADER_FORMAT, raw)
+    if magic != RECORD_MAGIC:
+        raise ValueError(f"Not a landmark recording: {path}")
+    if version != RECORD_VERSION or num_landmarks != NUM_LANDMARKS or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"Unsupported landmark recording format (version {version}, "
+                         f"{num_landmarks} landmarks, {record_size} byte records): {path}")
+
+
+class LandmarkReplay:
+    """
+    Read-only memory-mapped view of a landmark recording.
+    """
+
+    def __init__(self, path: str):
+        _read_header(path)
+        self.path: str = path
+        count = (os.path.getsize(path) - HEADER_SIZE) // RECORD_DTYPE.itemsize  # ignore a torn last record
+        if count > 0:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """(T,) capture timestamps"""
+        return self.records["timestamp"]
+
+    @property
+    def frame_indices(self) -> np.ndarray:
+        """(T,) frame indices"""
+        return self.records["frame_index"]
+
+    @property
+    def landmarks(self) -> np.ndarray:
+        """(T, 33, 4) landmarks"""
+        return self.records["landmarks"]
+
+    def iter_landmark_lists(self):
+        """
+        Yield (timestamp, frame index, NormalizedLandmarkList) per record, for consumers expecting protobufs.
+        """
+        for rec in self.records:
+            yield float(rec["timestamp"]), int(rec["frame_index"]), array_to_landmarks(rec["landmarks"])
+
+
+def replay_through_mapper(mapper, replay: LandmarkReplay, trigger: bool = False) -> np.ndarray:
+    """
+    Feed every recorded landmark set through the mapper.
+    :param mapper: PoseControlMapper instance
+    :param replay: recording to replay
+    :param trigger: also emit the controls to the mapper's virtual controller
+    :return: (T, 4) array of (steer, throttle, brake, steer angle) per record
+    """
+    out = np.empty((len(replay), 4), dtype=np.float32)
+    landmarks = replay.landmarks
+    timestamps = replay.timestamps.tolist()  # recorded capture times drive the jitter filter
+    for i in range(len(replay)):
+        f = mapper.extract_features(landmarks[i], timestamp=timestamps[i])  # (33, 4) arrays go straight in
+        out[i] = (f.right_pressure - f.left_pressure, f.throttle_pressure, f.brake_pressure, f.steer_angle)
+        if trigger:
+            mapper.trigger_control()
+    return out
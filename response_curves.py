@@ -0,0 +1,85 @@
+"""
+Group: Controller Liberators
+Response curves of the steering, throttle and brake pressures.
+
+The mapper computes every pressure as a linear ramp between two thresholds. A response curve reshapes that
+ramp, e.g. a dead zone around the center, finer control near zero with an exponent, or any shape given by
+points. Curves are defined in the "curves" section of a preset:
+    "throttle": {"type": "power", "deadzone": 0.05, "exponent": 1.8}
+- type: linear, power (x ** exponent), s-curve (steepness exponent around 0.5) or points
+- deadzone: share of the input range at the start mapped to 0, the rest is stretched to [0, 1]
+- exponent: curve exponent of power and s-curve
+- points: [[x, y], ...] with increasing x in [0, 1], linearly interpolated (type points)
+When a preset is applied the curves are compiled into dense lookup tables, so that evaluating a curve per
+frame is one table read and a linear interpolation, whatever the curve.
+"""
+
+from typing import Dict
+import numpy as np
+
+CURVE_CHANNELS = ("steering", "throttle", "brake")
+"""Pressures shaped by a curve, the keys of the preset curves section"""
+
+
+def _shape(x: np.ndarray, settings: dict) -> np.ndarray:
+    """Evaluate the curve defined by settings on inputs x in [0, 1]."""
+    kind = settings.get("type", "linear")
+    deadzone = settings.get("deadzone", 0.0)
+    if not 0.0 <= deadzone < 1.0:
+        raise ValueError(f"Curve deadzone must be in [0, 1), got {deadzone}")
+    x = np.clip((x - deadzone) / (1.0 - deadzone), 0.0, 1.0)
+    if kind == "linear":
+        return x
+    if kind == "power":
+        return x ** settings.get("exponent", 2.0)
+    if kind == "s-curve":
+        e = settings.get("exponent", 2.0)
+        return x ** e / (x ** e + (1.0 - x) ** e)
+    if kind == "points":
+        points = np.asarray(settings.get("points", ((0.0, 0.0), (1.0, 1.0))), dtype=np.float64)
+        if points.ndim != 2 or points.shape[1] != 2 or np.any(np.diff(points[:, 0]) <= 0.0):
+            raise ValueError("Curve points must be [[x, y], ...] pairs with increasing x")
+        return np.clip(np.interp(x, points[:, 0], points[:, 1]), 0.0, 1.0)
+    raise ValueError(f"Unknown curve type '{kind}', expected linear, power, s-curve or points")
+
+
+class ResponseCurve:
+    """
+    A response curve compiled into a lookup table over [0, 1].
+    """
+
+    def __init__(self, settings: dict, size: int = 1024):
+        self.identity: bool = (settings.get("type", "linear") == "linear"
+                               and not settings.get("deadzone", 0.0))  # passes values through unchanged
+        self.size: int = size  # table intervals
+        self.table: np.ndarray = _shape(np.linspace(0.0, 1.0, size + 1), settings)  # (size + 1,) outputs
+        self._lut: list = self.table.tolist() + [self.table[-1]]  # plain floats with a guard for x = 1
+        self._slopes: list = np.diff(self._lut).tolist()  # per-interval differences for the interpolation
+
+    def __call__(self, x: float) -> float:
+        """Curve value of a pressure x in [0, 1]."""
+        if self.identity:
+            return x
+        pos = x * self.size
+        i = int(pos)
+        return self._lut[i] + (pos - i) * self._slopes[i]
+
+    def apply(self, x: np.ndarray) -> np.ndarray:
+        """Curve values of an array of pressures in [0, 1]."""
+        if self.identity:
+            return x
+        pos = np.asarray(x, dtype=np.float64) * self.size
+        i = np.minimum(pos.astype(np.intp), self.size - 1)
+        return self.table[i] + (pos - i) * (self.table[i + 1] - self.table[i])
+
+
+class ResponseCurves:
+    """
+    The compiled response curves of a preset.
+    """
+
+    def __init__(self, settings: Dict[str, dict] = None, size: int = 1024):
+        settings = settings or {}
+        self.steering = ResponseCurve(settings.get("steering", {}), size)  # left and right pressures
+        self.throttle = ResponseCurve(settings.get("throttle", {}), size)
+        self.brake = ResponseCurve(settings.get("brake", {}), size)
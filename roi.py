@@ -0,0 +1,98 @@
+"""
+Group: Controller Liberators
+Region-of-interest tracking for the pose detector.
+
+The steering gesture only needs the upper body and hands. After a detection the tracker keeps a crop
+rectangle around those landmarks, so the next inference runs on fewer pixels; the crop is optionally
+downscaled as well. Landmarks detected in the crop are mapped back into full-frame normalized coordinates.
+When the pose is lost the tracker falls back to the full frame.
+
+The crop is only moved when the tracked landmarks come close to its border, a steady crop keeps
+MediaPipe's own frame-to-frame tracking valid.
+"""
+
+import numpy as np
+import cv2
+
+
+class RoiTracker:
+    """
+    Track a crop rectangle around the given landmarks.
+    """
+
+    def __init__(self, indices, margin: float = 0.25, edge_margin: float = 0.05, min_visibility: float = 0.5,
+                 max_side: int = 0, full_frame_ratio: float = 0.8):
+        self.indices = np.asarray(indices)  # landmarks that must stay inside the crop
+        self.margin: float = margin  # padding around the landmark bounding box, relative to its size
+        self.edge_margin: float = edge_margin  # re-center when landmarks get this close to the crop border
+        self.min_visibility: float = min_visibility  # landmarks below this visibility are ignored
+        self.max_side: int = max_side  # downscale the inference image to this longest side, 0 to disable
+        self.full_frame_ratio: float = full_frame_ratio  # use the full frame when the crop covers more area
+
+        self.rect = None  # (x0, y0, x1, y1) crop rectangle in full-frame pixels, None for the full frame
+        self._active = None  # (x0, y0, crop_w, crop_h, frame_w, frame_h) of the last prepared image
+
+    @property
+    def is_full_frame(self) -> bool:
+        return self.rect is None
+
+    def reset(self) -> None:
+        """Fall back to the full frame."""
+        self.rect = None
+
+    def prepare(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Cut (and downscale) the inference image out of the full RGB frame.
+        """
+        h, w = frame.shape[:2]
+        x0, y0, x1, y1 = self.rect if self.rect is not None else (0, 0, w, h)
+        crop = frame[y0:y1, x0:x1]
+        self._active = (x0, y0, x1 - x0, y1 - y0, w, h)
+
+        crop_h, crop_w = crop.shape[:2]
+        longest = max(crop_w, crop_h)
+        if self.max_side and longest > self.max_side:
+            scale = self.max_side / longest
+            return cv2.resize(crop, (max(1, round(crop_w * scale)), max(1, round(crop_h * scale))),
+                              interpolation=cv2.INTER_AREA)
+        return crop if self.rect is None else np.ascontiguousarray(crop)
+
+    def to_full(self, arr: np.ndarray) -> np.ndarray:
+        """
+        Map a (33, 4) landmark array from the last prepared image into full-frame normalized space, in place.
+        """
+        x0, y0, crop_w, crop_h, w, h = self._active
+        if crop_w == w and crop_h == h:
+            return arr  # downscaling alone does not change normalized coordinates
+        arr[:, 0] = (arr[:, 0] * crop_w + x0) / w
+        arr[:, 1] = (arr[:, 1] * crop_h + y0) / h
+        arr[:, 2] *= crop_w / w  # z shares the scale of x
+        return arr
+
+    def update(self, arr: np.ndarray) -> None:
+        """
+        Update the crop rectangle from full-frame normalized landmarks of the latest detection.
+        """
+        x0, y0, crop_w, crop_h, w, h = self._active
+        pts = arr[self.indices]
+        pts = pts[pts[:, 3] >= self.min_visibility]
+        if len(pts) < 2:
+            self.reset()  # tracked parts not visible, search the whole frame again
+            return
+
+        bx0, by0 = pts[:, 0].min() * w, pts[:, 1].min() * h
+        bx1, by1 = pts[:, 0].max() * w, pts[:, 1].max() * h
+        if self.rect is not None:
+            ex, ey = self.edge_margin * crop_w, self.edge_margin * crop_h
+            rx0, ry0, rx1, ry1 = self.rect
+            if bx0 >= rx0 + ex and by0 >= ry0 + ey and bx1 <= rx1 - ex and by1 <= ry1 - ey:
+                return  # still well inside the crop, keep it steady
+
+        pad_x = (bx1 - bx0) * self.margin
+        pad_y = (by1 - by0) * self.margin
+        nx0, ny0 = max(0, int(bx0 - pad_x)), max(0, int(by0 - pad_y))
+        nx1, ny1 = min(w, int(bx1 + pad_x) + 1), min(h, int(by1 + pad_y) + 1)
+        if (nx1 - nx0) * (ny1 - ny0) >= self.full_frame_ratio * w * h:
+            self.rect = None
+        else:
+            self.rect = (nx0, ny0, nx1, ny1)
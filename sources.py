@@ -0,0 +1,263 @@
+"""
+Group: Controller Liberators
+Pluggable frame sources.
+
+Every source follows the cv2.VideoCapture reading convention, read(image=None) -> (ret, BGR frame), so it
+can be used directly by the main loop or wrapped by ThreadedCapture. Besides the live camera, recorded
+video files, image directories and a synthetic generator allow repeatable runs on machines without a
+camera. File and synthetic sources either pace frames in real time or deliver them as fast as possible.
+
+Usage:
+    source = open_source("video:Recordings/drive.mp4", realtime=False)
+    ret, frame = source.read()
+    source.release()
+"""
+
+import math
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+import numpy as np
+import cv2
+
+
+class FrameSource(ABC):
+    """
+    Source of BGR frames with a cv2.VideoCapture-like interface.
+    """
+
+    def __init__(self, fps: float = 30.0, realtime: bool = True):
+        self.fps: float = fps  # nominal frame rate
+        self.realtime: bool = realtime  # pace frames at fps, otherwise deliver as fast as possible
+        self.frame_index: int = 0  # index of the next frame
+        self.frame_seq: int = 0  # sequence number of the frame last returned by read()
+        self.frame_timestamp: float = 0.0  # capture timestamp of the frame last returned by read()
+        self._next_due: Optional[float] = None
+
+    @property
+    def live(self) -> bool:
+        """Whether frames arrive in real time, so that dropping stale ones keeps the output fresh."""
+        return self.realtime
+
+    def _mark(self) -> None:
+        """Stamp the frame being returned by read()."""
+        self.frame_timestamp = time.perf_counter()
+        self.frame_seq += 1
+
+    def _pace(self) -> None:
+        """Sleep until the next frame is due in real-time mode."""
+        if not self.realtime or self.fps <= 0:
+            return
+        now = time.perf_counter()
+        if self._next_due is None or now - self._next_due > 1.0:
+            self._next_due = now  # first frame, or fell far behind: restart the schedule
+        elif self._next_due > now:
+            time.sleep(self._next_due - now)
+        self._next_due += 1.0 / self.fps
+
+    @staticmethod
+    def _into(frame: np.ndarray, image: Optional[np.ndarray]) -> np.ndarray:
+        """Copy the frame into the caller's buffer when it fits, mirroring cv2.VideoCapture.read(image=...)."""
+        if image is not None and image.shape == frame.shape and image.dtype == frame.dtype:
+            np.copyto(image, frame)
+            return image
+        return frame
+
+    @abstractmethod
+    def read(self, image: Optional[np.ndarray] = None):
+        """
+        Read the next frame.
+        :param image: optional buffer to read into
+        :return: (ret, frame), ret is False when the source is exhausted
+        """
+
+    def set(self, prop_id: int, value) -> bool:
+        """Set a capture property, unsupported by default."""
+        return False
+
+    def get(self, prop_id: int):
+        """Query a capture property."""
+        if prop_id == cv2.CAP_PROP_FPS:
+            return self.fps
+        return 0.0
+
+    def release(self) -> None:
+        """Release the source resources."""
+
+    def isOpened(self) -> bool:  # cv2.VideoCapture naming
+        return True
+
+
+class CameraSource(FrameSource):
+    """
+    Live camera.
+    """
+
+    def __init__(self, index: int = 0, resolution: tuple = (640, 480), fps: float = 30.0,
+                 fourcc: str = "", buffer_size: int = 0):
+        super().__init__(fps, realtime=False)  # the device paces itself
+        self.capture = cv2.VideoCapture(index)
+        # Codec first: several backends only offer the higher resolutions / frame rates with MJPG
+        if fourcc:
+            self.capture.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, resolution[0])
+        self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, resolution[1])
+        if fps:
+            self.capture.set(cv2.CAP_PROP_FPS, fps)
+        if buffer_size:
+            # A small driver queue keeps frames from going stale before they are read
+            self.capture.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+
+    @property
+    def live(self) -> bool:
+        return True
+
+    @property
+    def actual_resolution(self) -> tuple:
+        """Resolution the driver actually delivers."""
+        return int(self.capture.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    @property
+    def actual_fourcc(self) -> str:
+        """Codec the driver actually uses."""
+        code = int(self.capture.get(cv2.CAP_PROP_FOURCC))
+        return "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00")
+
+    def read(self, image=None):
+        ret, frame = self.capture.read(image=image)
+        if ret:
+            self._mark()
+        self.frame_index += ret
+        return ret, frame
+
+    def set(self, prop_id: int, value) -> bool:
+        return self.capture.set(prop_id, value)
+
+    def get(self, prop_id: int):
+        return self.capture.get(prop_id)
+
+    def isOpened(self) -> bool:
+        return self.capture.isOpened()
+
+    def release(self) -> None:
+        self.capture.release()
+
+
+class VideoFileSource(FrameSource):
+    """
+    Recorded video file.
+    """
+
+    def __init__(self, path: str, realtime: bool = True, loop: bool = False):
+        self.capture = cv2.VideoCapture(path)
+        if not self.capture.isOpened():
+            raise FileNotFoundError(f"Cannot open video file: {path}")
+        super().__init__(self.capture.get(cv2.CAP_PROP_FPS) or 30.0, realtime)
+        self.path: str = path
+        self.loop: bool = loop  # restart from the first frame at the end of the file
+
+    def read(self, image=None):
+        self._pace()
+        ret, frame = self.capture.read(image=image)
+        if not ret and self.loop and self.frame_index > 0:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.capture.read(image=image)
+        if ret:
+            self._mark()
+        self.frame_index += ret
+        return ret, frame
+
+    def isOpened(self) -> bool:
+        return self.capture.isOpened()
+
+    def release(self) -> None:
+        self.capture.release()
+
+
+class ImageDirSource(FrameSource):
+    """
+    Directory of still images, played in file name order.
+    """
+
+    IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+    def __init__(self, path: str, fps: float = 30.0, realtime: bool = True, loop: bool = False,
+                 preload: bool = True):
+        super().__init__(fps, realtime)
+        self.files = sorted(os.path.join(path, f) for f in os.listdir(path)
+                            if f.lower().endswith(self.IMAGE_EXTENSIONS))
+        if not self.files:
+            raise FileNotFoundError(f"No images found in: {path}")
+        self.loop: bool = loop  # restart from the first image at the end of the directory
+        # Preloading keeps disk I/O and decoding out of timed runs
+        self._frames = [cv2.imread(f) for f in self.files] if preload else None
+
+    def read(self, image=None):
+        if self.frame_index >= len(self.files):
+            if not self.loop:
+                return False, None
+            self.frame_index = 0
+        self._pace()
+        i = self.frame_index
+        frame = self._frames[i] if self._frames is not None else cv2.imread(self.files[i])
+        self.frame_index += 1
+        if frame is None:
+            return False, None
+        self._mark()
+        return True, self._into(frame, image)
+
+
+class SyntheticSource(FrameSource):
+    """
+    Deterministic generated frames: two bright blobs circling like hands on a steering wheel.
+    Useful to exercise capture, conversion and rendering without a camera, the pose detector will
+    usually not find a person in these frames.
+    """
+
+    def __init__(self, resolution: tuple = (640, 480), fps: float = 30.0, realtime: bool = True,
+                 num_frames: int = 0):
+        super().__init__(fps, realtime)
+        self.resolution: tuple = resolution
+        self.num_frames: int = num_frames  # frames to produce, 0 for endless
+        self._background = np.zeros((resolution[1], resolution[0], 3), dtype=np.uint8)
+        cv2.putText(self._background, "synthetic", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (80, 80, 80), 2)
+
+    def read(self, image=None):
+        if self.num_frames and self.frame_index >= self.num_frames:
+            return False, None
+        self._pace()
+        w, h = self.resolution
+        if image is None or image.shape != self._background.shape:
+            image = np.empty_like(self._background)
+        np.copyto(image, self._background)
+
+        angle = math.radians(30.0 * math.sin(self.frame_index * 2.0 * math.pi / 90.0))
+        radius = 0.2 * w
+        cx, cy = w // 2, h // 2
+        dx, dy = radius * math.cos(angle), radius * math.sin(angle)
+        cv2.circle(image, (int(cx - dx), int(cy - dy)), 25, (200, 200, 255), -1)
+        cv2.circle(image, (int(cx + dx), int(cy + dy)), 25, (200, 200, 255), -1)
+        self.frame_index += 1
+        self._mark()
+        return True, image
+
+
+def open_source(spec: str, resolution: tuple = (640, 480), fps: float = 30.0, realtime: bool = True,
+                loop: bool = False, fourcc: str = "", buffer_size: int = 0) -> FrameSource:
+    """
+    Create a frame source from a spec string:
+    'camera:<index>', 'video:<path>', 'images:<directory>' or 'synthetic[:<num frames>]'.
+    fourcc and buffer_size only apply to cameras.
+    """
+    kind, _, arg = spec.strip().partition(":")
+    kind = kind.lower()
+    if kind == "camera":
+        return CameraSource(int(arg or 0), resolution, fps, fourcc, buffer_size)
+    if kind == "video":
+        return VideoFileSource(arg, realtime, loop)
+    if kind == "images":
+        return ImageDirSource(arg, fps, realtime, loop)
+    if kind == "synthetic":
+        return SyntheticSource(resolution, fps, realtime, int(arg or 0))
+    raise ValueError(f"Unknown frame source '{spec}', expected camera:, video:, images: or synthetic")
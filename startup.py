@@ -0,0 +1,67 @@
+"""
+Group: Controller Liberators
+Parallel application startup.
+
+Opening the camera, building and warming up the pose graph, opening the calibration window and connecting
+the controller backend do not depend on each other, so they run concurrently on startup threads, each one
+importing its heavy modules (cv2, mediapipe, tkinter, ...) itself. The main thread meanwhile initializes
+pygame, which has to stay on the main thread. Durations of the tasks and milestones such as the first
+camera frame and the first control output (time-to-first-control) are reported once startup is over.
+
+Usage:
+    startup = Startup()
+    camera_future = startup.submit("camera", open_camera)
+    ...
+    startup.mark("first control")
+    startup.report()
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Tuple
+
+
+class Startup:
+    """
+    Run initialization tasks concurrently and time them.
+    """
+
+    def __init__(self, workers: int = 4):
+        self.t_start: float = time.perf_counter()  # startup time zero
+        self.tasks: Dict[str, Tuple[float, float]] = {}  # task name -> (start, duration) in seconds
+        self.milestones: Dict[str, float] = {}  # milestone name -> seconds since startup
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="startup")
+
+    def submit(self, name: str, fn, *args, **kwargs) -> Future:
+        """
+        Run fn(*args, **kwargs) on a startup thread, return its future.
+        """
+        def task():
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.tasks[name] = (t0 - self.t_start, time.perf_counter() - t0)
+        return self._executor.submit(task)
+
+    def mark(self, name: str) -> None:
+        """
+        Record a milestone, only its first occurrence counts.
+        """
+        if name not in self.milestones:
+            self.milestones[name] = time.perf_counter() - self.t_start
+
+    def report(self) -> None:
+        print("Startup:")
+        with self._lock:
+            tasks = sorted(self.tasks.items(), key=lambda kv: kv[1][0])
+        for name, (start, duration) in tasks:
+            print(f"  {name:<20} {start * 1000.0:8.1f} ms + {duration * 1000.0:8.1f} ms")
+        for name, t in sorted(self.milestones.items(), key=lambda kv: kv[1]):
+            print(f"  {name:<20} at {t * 1000.0:8.1f} ms")
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
@@ -1,12 +1,20 @@
-from threading import Thread
+from threading import Event, Thread
 from .tk_param import *
-import time
 from typing import Callable, List
 import warnings
 
 
+_UNSYNCED = object()
+
+
 class TKParamWindow:
-    def __init__(self, title="tkparam window"):
+    def __init__(self, title="tkparam window", store=None, sync_interval_ms: int = 20):
+        """
+        :param title: window title
+        :param store: optional parameter store (snapshot and publish(), e.g. ParamStore) the parameters are
+            synchronized with on the Tk thread, so that other threads never call into Tk
+        :param sync_interval_ms: interval of the synchronization with the store
+        """
         self._root = None
         self.title = title
         self._mainloop_thread = None
@@ -15,8 +23,16 @@ class TKParamWindow:
         self.params: dict = {}
         """Search by name"""
 
+        self.store = store
+        self.sync_interval_ms: int = sync_interval_ms
+        self._synced: dict = {}  # parameter name -> value last synchronized with the store
+        self._visible_request = None  # pending show (True) / hide (False) request, taken by the Tk thread
+        self._root_ready = Event()  # set by the Tk thread once the root window exists, or failed to
+
         self._start_thread_loop()
-        time.sleep(0.1)  # leave time for tk to initialize
+        self._root_ready.wait()  # parameters are created on the root right after construction
+        if self._root is None:
+            raise RuntimeError("tkparam window failed to start")
 
     @property
     def root(self):
@@ -36,10 +52,58 @@ class TKParamWindow:
         self._is_running = False
 
     def _creat_tk_thread(self):
-        self._root = ttk.Window()
-        self._root.title(self.title)
+        try:
+            self._root = ttk.Window()
+            self._root.title(self.title)
+        finally:
+            self._root_ready.set()
+        self._root.after(self.sync_interval_ms, self._sync_store)
         self._root.mainloop()
 
+    def set_visible(self, visible: bool) -> None:
+        """
+        Show or hide the window, callable from any thread: the Tk thread applies the request on its next sync.
+        """
+        self._visible_request = visible
+
+    def _sync_store(self):
+        """
+        Runs on the Tk thread: apply a pending show/hide request and the values other threads published to the
+        widgets, then publish the values changed in the window since the last call as one batch.
+        """
+        visible, self._visible_request = self._visible_request, None
+        if visible is True:
+            self._root.deiconify()
+        elif visible is False:
+            self._root.withdraw()
+        if self.store is not None:
+            self._sync_params()
+        self._root.after(self.sync_interval_ms, self._sync_store)
+
+    def _sync_params(self):
+        # The batch is only published onto the snapshot it was compared with: when another thread published in
+        # between, compare again, its values win over the window's as for any published value
+        while True:
+            snapshot = self.store.snapshot
+            values = snapshot.values
+            published, changes = {}, {}
+            for name, param in list(self.params.items()):
+                value = param.get()
+                if not isinstance(value, (int, float, bool)):  # plain buttons carry no value
+                    continue
+                synced = self._synced.get(name, _UNSYNCED)
+                if name in values and values[name] != synced:  # published by another thread
+                    published[name] = values[name]
+                elif value != synced:  # changed in the window
+                    changes[name] = value
+            if not changes or self.store.publish(changes, expected_version=snapshot.version) is not None:
+                break
+        for name, value in published.items():
+            if self.params[name].get() != value:
+                self.params[name].set(value)
+        self._synced.update(published)
+        self._synced.update(changes)
+
     def _check_name_duplication(self, name):
         if self.params.get(name) is not None:
             raise ValueError(f"Already created parameter named: '{name}', name duplication not allowed")
@@ -138,19 +202,26 @@ class TKParamWindow:
     def load_param_from_dict(self, param_dict: dict):
         """
         load parameters from a dictionary, will create new parameters if not exist
+        with a store, the values are published to it and the Tk thread applies them to the widgets
         :param param_dict: dictionary containing parameters and their values
         """
 
         def check_type(value):
             return isinstance(value, (int, float, bool))
 
+        accepted = {}
         for k, v in param_dict.items():
             if not check_type(v):
                 warnings.warn(f"type '{type(v)}' of parameter '{k}' is not acceptable, skipped", stacklevel=2)
                 continue
 
             if param := self.params.get(k):
-                param.set(v)
+                accepted[k] = v
+                if self.store is None:
+                    param.set(v)
             else:
                 warnings.warn(f"parameter named '{k}' not found, skipped", stacklevel=2)
                 continue
+
+        if self.store is not None:
+            self.store.publish(accepted)
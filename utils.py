@@ -1,13 +1,13 @@
 """
 Group: Controller Liberators
 This module contains utility functions
+pygame and tkinter are imported by the functions needing them, so that importing this module stays cheap
+for headless processes and does not delay startup.
 """
 import math
 import sys
-import pygame
 import ctypes
-from tkinter import messagebox, filedialog
-from typing import Union, List
+from typing import Union, List, Optional
 import platform
 
 
@@ -45,6 +45,7 @@ def set_window_topmost(set_topmost: bool) -> None:
     """Set window topmost on Windows platform."""
     # TODO: not work!
     if sys.platform == 'win32':
+        import pygame
         hwnd = pygame.display.get_wm_info()['window']
         if set_topmost:
             ctypes.windll.user32.SetWindowPos(hwnd, -1, 0, 0, 0, 0, 0x0003)
@@ -61,6 +62,7 @@ def set_window_transparency(set_transparent: bool) -> None:
     """
     if sys.platform == 'win32':
         try:
+            import pygame
             # Get window handle
             hwnd = pygame.display.get_wm_info()['window']
 
@@ -93,40 +95,54 @@ def set_window_transparency(set_transparent: bool) -> None:
             print(f"Failed to set window attributes: {e}")
 
 
-key2pygame_mapping = {
-    # a-z
-    'a': pygame.K_a, 'b': pygame.K_b, 'c': pygame.K_c, 'd': pygame.K_d, 'e': pygame.K_e,
-    'f': pygame.K_f, 'g': pygame.K_g, 'h': pygame.K_h, 'i': pygame.K_i, 'j': pygame.K_j,
-    'k': pygame.K_k, 'l': pygame.K_l, 'm': pygame.K_m, 'n': pygame.K_n, 'o': pygame.K_o,
-    'p': pygame.K_p, 'q': pygame.K_q, 'r': pygame.K_r, 's': pygame.K_s, 't': pygame.K_t,
-    'u': pygame.K_u, 'v': pygame.K_v, 'w': pygame.K_w, 'x': pygame.K_x, 'y': pygame.K_y,
-    'z': pygame.K_z,
+_key2pygame_mapping: Optional[dict] = None
+"""Mapping key strings to pygame key constants, built on first use"""
 
-    # 0-9
-    '0': pygame.K_0, '1': pygame.K_1, '2': pygame.K_2, '3': pygame.K_3, '4': pygame.K_4,
-    '5': pygame.K_5, '6': pygame.K_6, '7': pygame.K_7, '8': pygame.K_8, '9': pygame.K_9,
 
-    # F1 to F12
-    'f1': pygame.K_F1, 'f2': pygame.K_F2, 'f3': pygame.K_F3, 'f4': pygame.K_F4, 'f5': pygame.K_F5,
-    'f6': pygame.K_F6, 'f7': pygame.K_F7, 'f8': pygame.K_F8, 'f9': pygame.K_F9, 'f10': pygame.K_F10,
-    'f11': pygame.K_F11, 'f12': pygame.K_F12,
-
-    # Others
-    'space': pygame.K_SPACE, 'enter': pygame.K_RETURN,
-    'slash': pygame.K_SLASH, 'backslash': pygame.K_BACKSLASH,
-}
-"""Mapping key strings to pygame key constants"""
+def key2pygame(key: str, default: Optional[int] = None) -> Optional[int]:
+    """
+    Get the pygame key constant of a key string, e.g. 'k', 'f1' or 'space'.
+    """
+    global _key2pygame_mapping
+    if _key2pygame_mapping is None:
+        import pygame
+        _key2pygame_mapping = {
+            # a-z
+            'a': pygame.K_a, 'b': pygame.K_b, 'c': pygame.K_c, 'd': pygame.K_d, 'e': pygame.K_e,
+            'f': pygame.K_f, 'g': pygame.K_g, 'h': pygame.K_h, 'i': pygame.K_i, 'j': pygame.K_j,
+            'k': pygame.K_k, 'l': pygame.K_l, 'm': pygame.K_m, 'n': pygame.K_n, 'o': pygame.K_o,
+            'p': pygame.K_p, 'q': pygame.K_q, 'r': pygame.K_r, 's': pygame.K_s, 't': pygame.K_t,
+            'u': pygame.K_u, 'v': pygame.K_v, 'w': pygame.K_w, 'x': pygame.K_x, 'y': pygame.K_y,
+            'z': pygame.K_z,
+
+            # 0-9
+            '0': pygame.K_0, '1': pygame.K_1, '2': pygame.K_2, '3': pygame.K_3, '4': pygame.K_4,
+            '5': pygame.K_5, '6': pygame.K_6, '7': pygame.K_7, '8': pygame.K_8, '9': pygame.K_9,
+
+            # F1 to F12
+            'f1': pygame.K_F1, 'f2': pygame.K_F2, 'f3': pygame.K_F3, 'f4': pygame.K_F4, 'f5': pygame.K_F5,
+            'f6': pygame.K_F6, 'f7': pygame.K_F7, 'f8': pygame.K_F8, 'f9': pygame.K_F9, 'f10': pygame.K_F10,
+            'f11': pygame.K_F11, 'f12': pygame.K_F12,
+
+            # Others
+            'space': pygame.K_SPACE, 'enter': pygame.K_RETURN,
+            'slash': pygame.K_SLASH, 'backslash': pygame.K_BACKSLASH,
+        }
+    return _key2pygame_mapping.get(key, default)
 
 
 def fold_tkparam_win_on_close():
+    from tkinter import messagebox
     messagebox.showinfo("Cannot close", "Calibration window will be closed together with pygame window.")
 
 
 def save_preset_on_close() -> bool:
+    from tkinter import messagebox
     return messagebox.askyesno("Save preset?", "Do you want to save the current preset?")
 
 
 def select_preset_json() -> str:
+    from tkinter import filedialog
     return filedialog.askopenfilename(title="Select preset JSON file", filetypes=[("JSON files", "*.json")],
                                       initialdir="./Presets")
 